@@ -2,10 +2,40 @@ import socket
 import time
 import threading
 import struct
+import collections
+import selectors
 import serial
 from lib.pelco.protocols import PelcoPTZCommands, PelcoPresets
 from lib.pelco import *
 
+# Precompiled 7-byte packet layout, shared by Pelco-D and Pelco-P (both are seven unsigned bytes)
+_PACKET_STRUCT = struct.Struct('BBBBBBB')
+_PACK = _PACKET_STRUCT.pack
+
+# Pelco-D pan/tilt speed byte per percent of speed
+_SPEED_SCALE = 0x40 / 100
+
+# pan_tilt direction bits, bound once at import
+_CMD_RIGHT = PelcoPTZCommands.RIGHT[1]
+_CMD_LEFT = PelcoPTZCommands.LEFT[1]
+_CMD_UP = PelcoPTZCommands.UP[1]
+_CMD_DOWN = PelcoPTZCommands.DOWN[1]
+_CMD_STOP = PelcoPTZCommands.STOP[1]
+
+# Combined direction byte indexed by [sign(pan) + 1][sign(tilt) + 1]
+_DIR = (
+    (_CMD_LEFT | _CMD_DOWN, _CMD_LEFT, _CMD_LEFT | _CMD_UP),
+    (_CMD_DOWN, _CMD_STOP, _CMD_UP),
+    (_CMD_RIGHT | _CMD_DOWN, _CMD_RIGHT, _CMD_RIGHT | _CMD_UP),
+)
+
+# Seconds a query waits for its reply before its callback gets None
+_RESPONSE_TIMEOUT = 0.5
+
+
+def _clamp100(value):
+    return 0 if value < 0 else 100 if value > 100 else value
+
 
 class PTZController:
     def __init__(self):
@@ -21,17 +51,43 @@ class PTZController:
         self.pelco_presets = PelcoPresets
         self.pelco_device = PelcoDevice()
         self.get_address_callback = None
+        self._packet_cache = {}
+        self._create_cmd = self.create_pelco_command
+
+        # Outgoing command batching
+        self._tx_queue = collections.deque()
+        self._tx_buf = bytearray()  # reused to assemble each batch
+        self._tx_lock = threading.Lock()
+        self._tx_thread = None
+        self._tx_running = False
+
+        # Response pump: the writer thread also reads replies and hands them to waiting callbacks
+        self._selector = None
+        self._wake_r = self._wake_w = None
+        self._pending = collections.deque()  # (deadline, callback), in the order queries hit the wire
+        self._rx_buf = bytearray()
 
     def connect(self, ip="", port=8005, protocol="Pelco-D", address=1):
         self.ip = ip
         self.port = port
+        if address != self.address or protocol != self.protocol:
+            self._packet_cache.clear()
         self.protocol = protocol
         self.address = address
+        # Resolve the packet builder once instead of comparing protocol strings on every command
+        self._create_cmd = self.create_pelco_command if protocol == "Pelco-D" else self._create_unsupported_command
+        if protocol != "Pelco-D":
+            # The control builders only speak Pelco-D; say so once rather than dropping every command silently
+            print(f"{protocol} is not supported for PTZ control: pan/tilt/zoom/preset commands will not be sent")
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.settimeout(0.5)
+            # Small Pelco packets must not wait on Nagle; batching controls latency instead
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.socket.connect((self.ip, self.port))
+            self._set_quickack()
             self.connected = True
+            self._start_tx_thread()
             print(f"Connected to PTZ controller at {ip}")
             return True
         except Exception as e:
@@ -43,6 +99,8 @@ class PTZController:
         if self.moving:
             self.stop()
 
+        self._stop_tx_thread()
+
         if self.socket:
             try:
                 self.socket.close()
@@ -62,43 +120,203 @@ class PTZController:
         self.send(message, callback)
 
     def send(self, bytes_message, callback=None):
+        """Queue a packet for the writer thread. True only means it was queued, not that it was written;
+        use send_now() when the caller reports the outcome."""
         if not self.connected:
             print("Not connected to PTZ controller")
             return False
-        print(f"Sending {bytes_message.hex(" ")}")
+        if not bytes_message:
+            return False
+        print(f"Sending {bytes_message.hex(' ')}")
         if callback:
             self._send_async(bytes_message, callback)
         else:
-            return self._send(bytes_message)
+            # The caller only enqueues; the writer thread does the blocking socket I/O
+            self._tx_queue.append(bytes_message)
+            self._wake()
+        return True
+
+    def send_now(self, bytes_message):
+        """Write a packet (after anything already queued, to keep order) on the caller's thread.
+        True once the socket has accepted it."""
+        if not self.connected:
+            print("Not connected to PTZ controller")
+            return False
+        if not bytes_message:
+            return False
+        print(f"Sending {bytes_message.hex(' ')}")
+        with self._tx_lock:
+            batch = self._drain_tx()
+            batch += bytes_message
+            sent = self._send(memoryview(batch)) if self.socket else None
+        return sent is not None
+
+    def _start_tx_thread(self):
+        self._stop_tx_thread()
+        # A socketpair lets send() interrupt the writer thread's select()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.socket, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._tx_running = True
+        self._tx_thread = threading.Thread(target=self._tx_loop, daemon=True)
+        self._tx_thread.start()
+
+    def _stop_tx_thread(self):
+        self._tx_running = False
+        self._wake()
+        if self._tx_thread and self._tx_thread is not threading.current_thread():
+            self._tx_thread.join()
+        self._tx_thread = None
+        # Push out anything still queued (e.g. the final STOP) before the socket goes away
+        self._flush_tx()
+        if self._selector:
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+            self._selector = None
+            self._wake_r = self._wake_w = None
+        self._fail_pending()
+
+    def _wake(self):
+        """Interrupt the writer thread's select()"""
+        if self._wake_w:
+            try:
+                self._wake_w.send(b'\0')
+            except OSError:
+                pass  # Already has a wake-up pending
+
+    def _tx_loop(self):
+        """Writer thread: sleeps in select() until commands are queued or replies arrive,
+        sends everything pending at once and hands each reply to the oldest waiting callback"""
+        while self._tx_running:
+            try:
+                for key, _ in self._selector.select(self._next_timeout()):
+                    if key.fileobj is self._wake_r:
+                        self._wake_r.recv(4096)
+                    else:
+                        self._read_responses()
+                self._flush_tx()
+                if self._pending:
+                    self._set_quickack()
+            except OSError as e:
+                print(f"PTZ send error: {e}")
+                if self.connected:
+                    self._connection_lost()
+            self._expire_pending()
+
+    def _next_timeout(self):
+        """Time until the oldest query times out, or None to sleep until woken"""
+        if not self._pending:
+            return None
+        return max(0.0, self._pending[0][0] - time.monotonic())
+
+    def _read_responses(self):
+        data = self.socket.recv(4096)
+        if not data:
+            # Controller closed the connection
+            self._connection_lost()
+            return
+        self._set_quickack()
+
+        buf = self._rx_buf
+        buf += data
+        while len(buf) >= COMMAND_SIZE and self._pending:
+            packet = bytes(buf[:COMMAND_SIZE])
+            del buf[:COMMAND_SIZE]
+            self._pending.popleft()[1](packet)
+        if not self._pending:
+            # Unsolicited bytes have no one waiting for them
+            del buf[:]
+
+    def _expire_pending(self):
+        now = time.monotonic()
+        expired = False
+        while self._pending and self._pending[0][0] <= now:
+            self._pending.popleft()[1](None)
+            expired = True
+        if expired:
+            # A partial reply belongs to the query that just timed out
+            del self._rx_buf[:]
+
+    def _connection_lost(self):
+        """Mark the link down: stop watching the socket and hand waiting queries None right away"""
+        self.connected = False
+        if self._selector and self.socket:
+            try:
+                self._selector.unregister(self.socket)
+            except (KeyError, ValueError):
+                pass  # Already unregistered
+        self._fail_pending()
+
+    def _fail_pending(self):
+        while self._pending:
+            self._pending.popleft()[1](None)
+        del self._rx_buf[:]
+
+    def _flush_tx(self):
+        """Send every queued command in a single socket write"""
+        with self._tx_lock:
+            batch = self._drain_tx()
+            if batch and self.socket:
+                self._send(memoryview(batch))
+
+    def _drain_tx(self):
+        """Move queued packets into the shared batch buffer. Call with _tx_lock held."""
+        buf = self._tx_buf
+        del buf[:]
+        while self._tx_queue:
+            buf += self._tx_queue.popleft()
+        return buf
+
+    def _set_quickack(self):
+        """Ack query responses immediately (Linux only). The kernel clears this flag, so re-arm before reads."""
+        if hasattr(socket, 'TCP_QUICKACK'):
+            try:
+                self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            except OSError:
+                pass
 
     def _send_async(self, message, callback):
-        self._send(message)
-        try:
-            rsp = self.socket.recv(7)
-        except TimeoutError:
-            callback(None)
-            return
-        callback(rsp)
+        self._expect_replies((message,), (callback,))
+
+    def _expect_replies(self, packets, callbacks):
+        """Queue query packets; the writer thread passes each callback its reply (or None on timeout)"""
+        deadline = time.monotonic() + _RESPONSE_TIMEOUT
+        with self._tx_lock:
+            # Registered under the same lock as the packets so callbacks stay in wire order
+            self._pending.extend((deadline, callback) for callback in callbacks)
+            self._tx_queue.extend(packets)
+        self._wake()
 
     def _send(self, message):
         try:
-            amnt_sent = self.socket.send(message)
-            if amnt_sent < len(message):
-                self._connected = False
-            return amnt_sent
-        except (ConnectionResetError, ConnectionAbortedError, ConnectionError) as err:
-            self._connected = False
+            self.socket.sendall(message)
+            return len(message)
+        except OSError:
+            # Connection errors, and a sendall() that hit the socket timeout, leave the link unusable
+            self._connection_lost()
 
     def set_address_provider(self, callback):
         """Set function to retrieve current PTZ address dynamically"""
         self.get_address_callback = callback
 
+    def _cached(self, key, builder):
+        """Return a prebuilt constant packet for the current address, building it on first use"""
+        cache_key = (self.address, key)
+        packet = self._packet_cache.get(cache_key)
+        if packet is None:
+            packet = self._packet_cache[cache_key] = builder()
+        return packet
+
     def create_pelco_command(self, cmd1=0, cmd2=0, data1=0, data2=0):
-        sync = 0xFF
-        packet = [self.address, cmd1, cmd2, data1, data2]
-        packet.append(sum(packet) % 0x100)
-        packet.insert(0, sync)
-        return bytes(packet)
+        addr = self.address
+        return _PACK(0xFF, addr, cmd1, cmd2, data1, data2, (addr + cmd1 + cmd2 + data1 + data2) & 0xFF)
+
+    def _create_unsupported_command(self, cmd1=0, cmd2=0, data1=0, data2=0):
+        """Builder used for protocols without an implementation of the requested control"""
+        return None
 
     def create_pelco_p_command(self, command, data1=0, data2=0):
         """Create a Pelco-P protocol command packet"""
@@ -109,96 +327,65 @@ class PTZController:
         checksum = self.address ^ command ^ data1 ^ data2
 
         # Create command packet
-        packet = struct.pack('BBBBBBB', stx, self.address, command, data1, data2, checksum, etx)
-
-        return packet
+        return _PACK(stx, self.address, command, data1, data2, checksum, etx)
 
     def pan_tilt(self, pan_pct, tilt_pct):
         # Clamp speeds to valid range
         # pan_speed = max(0, min(100, pan_pct))
         # tilt_speed = max(0, min(100, tilt_pct))
 
-        pan_value = abs(pan_pct)
-        tilt_value = abs(tilt_pct)
-        # Determine direction
-        cmd = 0x00
-        if pan_pct > 0:
-            cmd |= self.pelco_commands.RIGHT[1]
-        elif pan_pct < 0:
-            cmd |= self.pelco_commands.LEFT[1]
-
-        if tilt_pct > 0:
-            cmd |= self.pelco_commands.UP[1]
-        elif tilt_pct < 0:
-            cmd |= self.pelco_commands.DOWN[1]
-        # If no movement, send stop command
-        if pan_pct == 0 and tilt_pct == 0:
-            cmd = self.pelco_commands.STOP[1]
-            pan_value = 0
-            tilt_value = 0
-        pan_value = int(pan_value / 100 * 64)
-        tilt_value = int(tilt_value / 100 * 64)
-        packet = self.create_pelco_command(0, cmd, pan_value, tilt_value)
-        self.send(packet)
+        # Determine direction (STOP when neither axis moves)
+        cmd = _DIR[(pan_pct > 0) - (pan_pct < 0) + 1][(tilt_pct > 0) - (tilt_pct < 0) + 1]
+        pan_value = int(abs(pan_pct) * _SPEED_SCALE)
+        tilt_value = int(abs(tilt_pct) * _SPEED_SCALE)
+        self.send(self.create_pelco_command(0, cmd, pan_value, tilt_value))
 
     def stop(self):
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.STOP[1], 0, 0)
-
-            self.send(packet)
+        packet = self._cached(('stop',), lambda: self._create_cmd(0, self.pelco_commands.STOP[1], 0, 0))
+        self.send(packet)
         self.moving = False
 
         if self.move_thread:
             self.move_thread.cancel()
 
     def zoom_tele(self, speed=100):
-        speed_value = min(100, max(0, speed))
-
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.ZOOM_TELE[1], speed_value, speed_value)
-            self.send(packet)
+        speed_value = _clamp100(speed)
+        packet = self._create_cmd(0, self.pelco_commands.ZOOM_TELE[1], speed_value, speed_value)
+        self.send(packet)
 
     def zoom_wide(self, speed=100):
-        speed_value = min(100, max(0, speed))
-
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.ZOOM_WIDE[1], speed_value, speed_value)
-            self.send(packet)
+        speed_value = _clamp100(speed)
+        packet = self._create_cmd(0, self.pelco_commands.ZOOM_WIDE[1], speed_value, speed_value)
+        self.send(packet)
 
     def zoom_stop(self):
         self.stop()
 
     def focus_near(self, speed=100):
-        speed_value = min(100, max(0, speed))
-
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(self.pelco_commands.FOCUS_NEAR[0], self.pelco_commands.FOCUS_NEAR[1],
-                                               0, speed_value)
-            self.send(packet)
+        speed_value = _clamp100(speed)
+        packet = self._create_cmd(self.pelco_commands.FOCUS_NEAR[0], self.pelco_commands.FOCUS_NEAR[1],
+                                  0, speed_value)
+        self.send(packet)
 
     def focus_far(self, speed=100):
-        speed_value = min(100, max(0, speed))
-
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.FOCUS_FAR[1], 0, speed_value)
-            self.send(packet)
+        speed_value = _clamp100(speed)
+        packet = self._create_cmd(0, self.pelco_commands.FOCUS_FAR[1], 0, speed_value)
+        self.send(packet)
 
     def focus_stop(self):
         """Stop focus movement"""
         self.stop()
 
     def set_auto_focus(self, enabled):
-        if self.protocol == "Pelco-D":
-            if enabled:
-                packet = self.create_pelco_command(0, self.pelco_commands.CALL_PRESET[1], 0, self.pelco_presets.ZT_AF_ON)
-            else:
-                packet = self.create_pelco_command(0, self.pelco_commands.CALL_PRESET[1],0, self.pelco_presets.ZT_AF_OFF)
-            self.send(packet)
+        preset = self.pelco_presets.ZT_AF_ON if enabled else self.pelco_presets.ZT_AF_OFF
+        packet = self._cached(('af', bool(enabled)),
+                              lambda: self._create_cmd(0, self.pelco_commands.CALL_PRESET[1], 0, preset))
+        self.send(packet)
 
     def execute_focus(self):
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.CALL_PRESET[1], 0, self.pelco_presets.EXECUTE_AUTOFOCUS)
-            self.send(packet)
+        packet = self._cached(('exec_focus',), lambda: self._create_cmd(
+            0, self.pelco_commands.CALL_PRESET[1], 0, self.pelco_presets.EXECUTE_AUTOFOCUS))
+        self.send(packet)
 
     def set_zoom(self, zoom):
         zoom_value = int(zoom / 100 * 0xFFFF)
@@ -213,13 +400,13 @@ class PTZController:
 
     def set_pan(self, degrees, speed=0):
         pan_value = int(degrees * 100)
-        speed = int(min(100, max(0, speed)) * 0x40 / 100)
+        speed = int(_clamp100(speed) * _SPEED_SCALE)
         packet = self.create_pelco_command(speed, self.pelco_commands.SET_PAN[1], pan_value >> 8, pan_value & 0xff)
         self.send(packet)
 
     def set_tilt(self, degrees, speed=0):
         tilt_value = int(degrees * 100)
-        speed = int(min(100, max(0, speed)) * 0x40 / 100)
+        speed = int(_clamp100(speed) * _SPEED_SCALE)
         packet = self.create_pelco_command(speed, self.pelco_commands.SET_TILT[1], tilt_value >> 8, tilt_value & 0xff)
         self.send(packet)
 
@@ -230,9 +417,8 @@ class PTZController:
             print("Preset number must be between 1 and 255")
             return
 
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.CALL_PRESET[1], 0, preset_num)
-            self.send(packet)
+        packet = self._create_cmd(0, self.pelco_commands.CALL_PRESET[1], 0, preset_num)
+        self.send(packet)
 
     def set_preset(self, preset_num):
         """Save current position as a preset"""
@@ -240,12 +426,8 @@ class PTZController:
             print("Preset number must be between 1 and 255")
             return False
 
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.SET_PRESET[1], 0, preset_num)
-        else:
-            packet = self.create_pelco_p_command(self.pelco_commands["SET_PRESET"], 0, preset_num)
-
-        success = self.send(packet)
+        packet = self._create_cmd(0, self.pelco_commands.SET_PRESET[1], 0, preset_num)
+        success = self.send_now(packet)
         if success:
             print(f"Saved position as preset {preset_num}")
         return success
@@ -255,24 +437,35 @@ class PTZController:
             print("Preset number must be between 1 and 255")
             return False
 
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.CLEAR_PRESET[1], 0, preset_num)
-
-            success = self.send(packet)
-            if success:
-                print(f"Cleared preset {preset_num}")
-            return success
+        packet = self._create_cmd(0, self.pelco_commands.CLEAR_PRESET[1], 0, preset_num)
+        success = self.send_now(packet)
+        if success:
+            print(f"Cleared preset {preset_num}")
+        return success
 
     def goto_home(self):
-        if self.protocol == "Pelco-D":
-            packet = self.create_pelco_command(0, self.pelco_commands.CALL_PRESET[1], 0, self.pelco_presets.HOME)
-            self.send(packet)
+        packet = self._cached(('home',), lambda: self._create_cmd(
+            0, self.pelco_commands.CALL_PRESET[1], 0, self.pelco_presets.HOME))
+        self.send(packet)
 
     def query_position_value(self, opcode, callback):
         """Send a query command and execute callback on response."""
         packet = self.create_pelco_command(0x00, opcode, 0x00, 0x00)
         self.send(packet, callback)
 
+    def query_position_batch(self, opcodes, callbacks):
+        """Send several query commands in one write and pass each callback its response, in order."""
+        if not self.connected:
+            print("Not connected to PTZ controller")
+            return False
+
+        self._expect_replies([self.create_pelco_command(0x00, op, 0x00, 0x00) for op in opcodes], callbacks)
+        return True
+
+    def get_all_positions(self, callback):
+        """Query pan, tilt, zoom and focus in a single round trip"""
+        return self.query_position_batch((0x51, 0x53, 0x55, 0x61), (callback,) * 4)
+
     def get_pan(self, callback):
         return self.query_position_value(0x51, callback)
 
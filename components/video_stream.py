@@ -1,49 +1,260 @@
 import os
+import sys
 import threading
+import collections
 
 import cv2
 import numpy as np
 from PySide6.QtWidgets import (QLabel, QPushButton, QHBoxLayout, QVBoxLayout,
                                QWidget, QMessageBox, QFileDialog, QGridLayout,
                                QStackedWidget, QSpinBox, QSizePolicy)
-from PySide6.QtCore import Qt, QThread, Signal, Slot, QMutex, QMutexLocker
+from PySide6.QtCore import (Qt, QThread, Signal, Slot, QMutex, QMutexLocker, QTimer, QWaitCondition,
+                            QReadWriteLock, QReadLocker, QWriteLocker)
 from PySide6.QtGui import QImage, QPixmap, QPainter, QFont
 import time
 import re
 
 
+# Grid downscaling runs on the GPU when OpenCV is built with CUDA (cudawarping) and a device is present
+_CUDA_ENABLED = cv2.cuda.getCudaEnabledDeviceCount() > 0 and hasattr(cv2.cuda, "resize")
+
+# Recycled frame buffers kept per stream
+_POOL_SIZE = 3
+
+# Frames bound for the GPU are decoded into page-locked memory when cupy can provide it, so uploads
+# DMA straight from the buffer instead of staging through a driver bounce buffer
+_pinned_alloc = None
+if _CUDA_ENABLED:
+    try:
+        import cupy
+        _pinned_alloc = cupy.cuda.alloc_pinned_memory
+    except ImportError:
+        pass
+
+
+def _alloc_frame(shape):
+    if _pinned_alloc is None:
+        return np.empty(shape, np.uint8)
+    size = int(np.prod(shape))
+    return np.frombuffer(_pinned_alloc(size), np.uint8, size).reshape(shape)
+
+# Low-latency RTSP demuxing for OpenCV's FFmpeg backend: TCP transport, no input buffering and a small
+# probe window. Read when each capture is opened; an options string set by the user takes precedence.
+os.environ.setdefault(
+    "OPENCV_FFMPEG_CAPTURE_OPTIONS",
+    "rtsp_transport;tcp|fflags;nobuffer|flags;low_delay|analyzeduration;1000000|probesize;32768|max_delay;500000"
+)
+
+# Give up on a dead source after 5 s instead of FFmpeg's ~30 s default
+_CAPTURE_TIMEOUTS = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 5000, cv2.CAP_PROP_READ_TIMEOUT_MSEC, 5000]
+
+
+def _open_capture(url):
+    """Open a stream on FFmpeg with hardware decoding (NVDEC, VAAPI, D3D11 or VideoToolbox, whichever
+    the OpenCV build and machine provide), falling back to software decoding"""
+    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG,
+                           [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY] + _CAPTURE_TIMEOUTS)
+    if cap.isOpened():
+        return cap
+    cap.release()
+
+    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG, _CAPTURE_TIMEOUTS)
+    if cap.isOpened():
+        return cap
+    cap.release()
+
+    return cv2.VideoCapture(url)
+
+
+# H.264 (fourcc, backend) pairs to record with, best first. Media Foundation drives the GPU's encoder
+# directly on Windows; FFmpeg picks NVENC, QSV, AMF, VAAPI or VideoToolbox elsewhere.
+_H264_WRITERS = (
+    (("avc1", cv2.CAP_MSMF),) if sys.platform.startswith("win") else ()
+) + (("avc1", cv2.CAP_FFMPEG), ("H264", cv2.CAP_FFMPEG))
+
+
+def _make_writer(filename, fps, frame_size):
+    """Open an H.264 VideoWriter on a hardware-accelerated backend when one is available, falling back
+    to the software mp4v codec. Returns the writer and a short description of what it resolved to."""
+    params = [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    for fourcc, backend in _H264_WRITERS:
+        writer = cv2.VideoWriter(filename, backend, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size, params)
+        if writer.isOpened():
+            accelerated = writer.get(cv2.VIDEOWRITER_PROP_HW_ACCELERATION) != cv2.VIDEO_ACCELERATION_NONE
+            return writer, f"H.264 via {writer.getBackendName()}{' (hardware)' if accelerated else ''}"
+        writer.release()
+
+    writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*"mp4v"), fps, frame_size)
+    return writer, "MPEG-4 (mp4v)"
+
+
+class _FrameCanvas:
+    """Two label-sized pixmaps painted alternately. The one being drawn is never the one the label
+    still shows, so Qt has no reason to detach and copy it; nothing is allocated per frame."""
+
+    def __init__(self):
+        self._pixmaps = [QPixmap(), QPixmap()]
+        self._index = 0
+
+    def resize(self, w, h, dpr):
+        """Reallocate both pixmaps for a new label size (in device pixels)"""
+        self._pixmaps = []
+        for _ in range(2):
+            pixmap = QPixmap(w, h)
+            pixmap.setDevicePixelRatio(dpr)
+            self._pixmaps.append(pixmap)
+
+    def render(self, frame, rect):
+        """Draw a BGR frame scaled to fill rect and return the pixmap to show, or None if unsized"""
+        self._index ^= 1
+        pixmap = self._pixmaps[self._index]
+        if pixmap.isNull():
+            return None
+
+        # Qt reads OpenCV's BGR layout directly; drawImage is done with frame before returning
+        fh, fw = frame.shape[:2]
+        image = QImage(frame.data, fw, fh, frame.strides[0], QImage.Format_BGR888)
+        painter = QPainter(pixmap)
+        painter.drawImage(rect, image)
+        painter.end()
+        return pixmap
+
+
+class VideoLabel(QLabel):
+    """QLabel for video frames. Its destination pixmaps are rebuilt on resize, not per frame."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._canvas = _FrameCanvas()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        dpr = self.devicePixelRatioF()
+        self._canvas.resize(int(self.width() * dpr), int(self.height() * dpr), dpr)
+
+    def frame_pixmap(self, frame):
+        """frame scaled to fill the label, ready for setPixmap; None before the label is laid out"""
+        return self._canvas.render(frame, self.rect())
+
+
+class RecordingWriter(QThread):
+    """Owns the VideoWriter and encodes/writes frames off the capture threads. If the disk falls behind,
+    the oldest queued frame is dropped rather than stalling capture."""
+
+    def __init__(self, writer, release_frame, max_frames=60):
+        super().__init__()
+        self._writer = writer
+        self._release_frame = release_frame  # returns a written or dropped frame to its buffer pool
+        self._queue = collections.deque()
+        self._max_frames = max_frames
+        self._mutex = QMutex()
+        self._cond = QWaitCondition()
+        self._running = True
+
+    def push(self, frame):
+        dropped = None
+        with QMutexLocker(self._mutex):
+            if len(self._queue) >= self._max_frames:
+                dropped = self._queue.popleft()
+            self._queue.append(frame)
+            self._cond.wakeOne()
+        if dropped is not None:
+            self._release_frame(dropped)
+
+    def run(self):
+        while True:
+            with QMutexLocker(self._mutex):
+                while self._running and not self._queue:
+                    self._cond.wait(self._mutex)
+                if not self._queue:
+                    break  # stopped and drained
+                frame = self._queue.popleft()
+            self._writer.write(frame)
+            self._release_frame(frame)
+        self._writer.release()
+
+    def stop(self):
+        """Write out what is queued, then close the file"""
+        with QMutexLocker(self._mutex):
+            self._running = False
+            self._cond.wakeOne()
+        self.wait()
+
+
 class VideoWorker(QThread):
-    frame_ready = Signal(int, np.ndarray)
+    frame_available = Signal(int)  # a new grid frame for stream_id is waiting in take_frame()
     connection_status = Signal(bool, str)
     error_occurred = Signal(str)
-    active_frame_ready = Signal(np.ndarray)
+    active_frame_available = Signal()  # a new main-view frame is waiting in take_active_frame()
 
     def __init__(self):
         super().__init__()
         self._running = False
         self._caps = {}
         self._urls = {}
-        self._mutex = QMutex()
+        # One lock per concern so GUI setters and the capture loop do not serialize on each other
+        self._url_mutex = QMutex()  # _urls and _target_sizes
+        self._caps_lock = QReadWriteLock()  # readers only look up; connect/release write
+        self._rec_mutex = QMutex()  # recording state and _recorder
+        # Rebound whole from the GUI and read lock-free by the run loop (attribute stores are atomic)
         self._active_stream_id = 0
+        self._grid_mode = False  # in single view only the active stream's frames are decoded
         self._stream_locks = {}
+        self._target_sizes = {}  # stream_id -> (w, h) of the grid cell showing it
+        self._main_size = None  # (w, h) of the main label in device pixels
+        self._gpu = {}  # (stream_id, view) -> (cuda_Stream, source GpuMat, resized GpuMat), reused across frames
+
+        # Latest undisplayed frames. A newer frame replaces an older one the GUI has not taken yet,
+        # so a slow GUI drops frames instead of queueing them without bound.
+        self._frame_mutex = QMutex()
+        self._latest_frames = {}
+        self._latest_active = None
+
+        # Retrieved frames are decoded into recycled buffers. A buffer returns to its stream's free list
+        # once the worker, the pending slots and the GUI (via release_frame) are all done with it.
+        self._free_buffers = {}  # stream_id -> [ndarray]
+        self._frame_shapes = {}  # stream_id -> shape of its last decoded frame
+        self._buffer_refs = {}  # id(frame) -> [frame, stream_id, holders]
+
+        # run() supervises one reader thread per stream. Readers exit when their stream is removed or
+        # when stop() bumps the generation, and release their own capture on the way out.
+        self._readers = {}  # stream_id -> threading.Thread
+        self._generation = 0
+        self._streams_changed = threading.Event()
 
         # Recording attributes
         self._recording_path = None
         self._recording = False
         self._paused = False
-        self._writer = None
+        self._recorder = None  # RecordingWriter while recording
         self._output_file = None
-        self._fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        self.recording_codec = None  # description of the writer in use, for status messages
         self._fps = 20.0
         self._frame_size = None
 
     def set_url(self, stream_id, url):
-        with QMutexLocker(self._mutex):
+        with QMutexLocker(self._url_mutex):
+            changed = self._urls.get(stream_id) != url
             self._urls[stream_id] = url
+        if changed:
+            # The reader notices the new URL and reconnects; nobody else may use the old capture meanwhile
+            self._drop_cap(stream_id)
+        self._streams_changed.set()
 
     def set_active_stream(self, stream_id):
-        with QMutexLocker(self._mutex):
-            self._active_stream_id = stream_id
+        self._active_stream_id = stream_id
+
+    def set_grid_mode(self, enabled):
+        self._grid_mode = enabled
+
+    def set_target_size(self, stream_id, size):
+        """Size grid frames for stream_id are downscaled to before they are emitted"""
+        with QMutexLocker(self._url_mutex):
+            self._target_sizes[stream_id] = size
+
+    def set_main_size(self, size):
+        """Size active-stream display frames are downscaled to; recording keeps full resolution"""
+        self._main_size = size
 
     def add_stream(self, stream_id, url):
         self.set_url(stream_id, url)
@@ -51,93 +262,152 @@ class VideoWorker(QThread):
             self._stream_locks[stream_id] = threading.Lock()
 
     def remove_stream(self, stream_id):
-        with QMutexLocker(self._mutex):
-            if stream_id in self._caps:
-                if self._caps[stream_id] and self._caps[stream_id].isOpened():
-                    self._caps[stream_id].release()
-                del self._caps[stream_id]
+        # The stream's reader sees its URL gone and releases the capture itself
+        with QMutexLocker(self._url_mutex):
             if stream_id in self._urls:
                 del self._urls[stream_id]
-            if stream_id in self._stream_locks:
-                del self._stream_locks[stream_id]
+            self._target_sizes.pop(stream_id, None)
+        self._drop_cap(stream_id)
+        if stream_id in self._stream_locks:
+            del self._stream_locks[stream_id]
+        frame = self.take_frame(stream_id)
+        if frame is not None:
+            self.release_frame(frame)
+        with QMutexLocker(self._frame_mutex):
+            self._free_buffers.pop(stream_id, None)
+            self._frame_shapes.pop(stream_id, None)
 
     def run(self):
         self._running = True
+        generation = self._generation
         while self._running:
             try:
-                # Process all streams
-                stream_ids = list(self._urls.keys())
+                # Make sure every configured stream has a live reader
+                with QMutexLocker(self._url_mutex):
+                    stream_ids = [stream_id for stream_id, url in self._urls.items() if url]
                 for stream_id in stream_ids:
-                    if not self._running:
-                        break
-
-                    if stream_id not in self._caps or not self._caps.get(stream_id) or not self._caps[
-                        stream_id].isOpened():
-                        self._connect(stream_id)
-
-                    if stream_id in self._caps and self._caps[stream_id] and self._caps[stream_id].isOpened():
-                        self._process_stream(stream_id)
-
-                self.msleep(10)
+                    reader = self._readers.get(stream_id)
+                    if reader is None or not reader.is_alive():
+                        reader = threading.Thread(target=self._read_loop, args=(stream_id, generation), daemon=True)
+                        self._readers[stream_id] = reader
+                        reader.start()
             except Exception as e:
                 self.error_occurred.emit(f"Error: {e}")
                 time.sleep(1)
 
-    def _connect(self, stream_id):
-        url = self._urls.get(stream_id, "")
-
-        if not url or url == "":
-            return False
+            self._streams_changed.wait(1.0)
+            self._streams_changed.clear()
+
+        for reader in list(self._readers.values()):
+            reader.join(timeout=1.0)
+
+    def _read_loop(self, stream_id, generation):
+        """Reader thread for one stream. It blocks in grab() on the network read, so frames are taken
+        as soon as they arrive and a slow stream never holds up the others."""
+        # The reader owns its capture: it is only ever this thread's own connection, never one left in
+        # _caps by an earlier reader or opened for a URL the stream no longer has
+        cap, cap_url = None, None
+        while self._running and generation == self._generation:
+            with QMutexLocker(self._url_mutex):
+                url = self._urls.get(stream_id)
+            if not url:
+                break
+
+            if cap is not None and (url != cap_url or not cap.isOpened()):
+                self._release_cap(stream_id, cap)
+                cap = None
+            if cap is None:
+                cap = self._connect(stream_id, url)
+                if cap is None:
+                    time.sleep(1)  # back off before retrying the connection
+                    continue
+                cap_url = url
+
+            if not self._process_stream(stream_id, cap):
+                time.sleep(0.01)  # grab failed; don't spin on a stalled source
+
+        self._release_cap(stream_id, cap)
+        with QWriteLocker(self._caps_lock):
+            self._gpu.pop((stream_id, "grid"), None)
+            self._gpu.pop((stream_id, "main"), None)
+
+    def _release_cap(self, stream_id, cap):
+        """Release a reader's capture, dropping it from _caps unless a newer reader has replaced it"""
+        if cap is None:
+            return
+        with QWriteLocker(self._caps_lock):
+            if self._caps.get(stream_id) is cap:
+                del self._caps[stream_id]
+        cap.release()
+
+    def _drop_cap(self, stream_id):
+        """Forget stream_id's capture. Its reader owns it and releases it; with no reader left, release it here"""
+        with QWriteLocker(self._caps_lock):
+            cap = self._caps.pop(stream_id, None)
+        reader = self._readers.get(stream_id)
+        if cap is not None and (reader is None or not reader.is_alive()):
+            cap.release()
+
+    def _open_cap(self, stream_id):
+        """The stream's capture if it is open, else None"""
+        with QReadLocker(self._caps_lock):
+            cap = self._caps.get(stream_id)
+        return cap if cap and cap.isOpened() else None
+
+    def _connect(self, stream_id, url):
+        """Open url for stream_id and publish it in _caps; the capture, or None on failure"""
+        if not url:
+            return None
 
         try:
-            # Use optimized parameters
-            cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-
-            if not cap.isOpened():
-                cap.release()
-                cap = cv2.VideoCapture(url)
+            cap = _open_capture(url)
 
             if cap.isOpened():
-                with QMutexLocker(self._mutex):
+                # Use optimized parameters
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                cap.set(cv2.CAP_PROP_FPS, 30)
+                with QWriteLocker(self._caps_lock):
                     self._caps[stream_id] = cap
                 self.connection_status.emit(True, f"Connected to stream {stream_id}")
-                return True
+                return cap
             else:
+                cap.release()
                 self.connection_status.emit(False, f"Failed to connect to stream {stream_id}")
-                return False
+                return None
 
         except Exception as e:
             self.error_occurred.emit(f"Connection error: {str(e)}")
-            return False
+            return None
 
     def start_recording(self, filename: str):
         if self._recording:
             return
 
-        with QMutexLocker(self._mutex):
-            if self._active_stream_id not in self._caps or not self._caps[self._active_stream_id].isOpened():
-                raise RuntimeError("Cannot start recording: no active stream")
+        cap = self._open_cap(self._active_stream_id)
+        if not cap:
+            raise RuntimeError("Cannot start recording: no active stream")
 
+        with QMutexLocker(self._rec_mutex):
             self._frame_size = (
-                int(self._caps[self._active_stream_id].get(cv2.CAP_PROP_FRAME_WIDTH)),
-                int(self._caps[self._active_stream_id].get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
             )
             self._output_file = filename
-            self._writer = cv2.VideoWriter(filename, self._fourcc, self._fps, self._frame_size)
-            if not self._writer.isOpened():
+            writer, self.recording_codec = _make_writer(filename, self._fps, self._frame_size)
+            if not writer.isOpened():
                 raise RuntimeError("Failed to initialize VideoWriter")
+            self._recorder = RecordingWriter(writer, self.release_frame)
+            self._recorder.start()
             self._recording = True
             self._paused = False
 
     def pause_recording(self):
-        with QMutexLocker(self._mutex):
+        with QMutexLocker(self._rec_mutex):
             if self._recording:
                 self._paused = True
 
     def resume_recording(self):
-        with QMutexLocker(self._mutex):
+        with QMutexLocker(self._rec_mutex):
             if self._recording and self._paused:
                 self._paused = False
 
@@ -145,57 +415,165 @@ class VideoWorker(QThread):
         if not self._recording:
             return
 
-        with QMutexLocker(self._mutex):
+        with QMutexLocker(self._rec_mutex):
             self._recording = False
-            if self._writer:
-                self._writer.release()
-                self._writer = None
+            recorder, self._recorder = self._recorder, None
+        if recorder:
+            recorder.stop()
 
-    def _process_stream(self, stream_id):
+    def _process_stream(self, stream_id, cap):
+        """Grab and dispatch one frame; False if that failed and the reader should back off"""
         try:
-            if stream_id not in self._caps or not self._caps[stream_id] or not self._caps[stream_id].isOpened():
-                return
-
-            cap = self._caps[stream_id]
-
             grabbed = cap.grab()
             if not grabbed:
-                return
+                return False
+            # Streams nobody is looking at are only drained; decoding is the expensive part
+            if not self._grid_mode and stream_id != self._active_stream_id:
+                return True
 
-            ok, frame = cap.retrieve()
+            ok, frame = cap.retrieve(self._acquire_buffer(stream_id))
             if not ok or frame is None:
-                return
+                return True
+            self._hold(stream_id, frame)
+            try:
+                self._dispatch_frame(stream_id, frame)
+            finally:
+                self.release_frame(frame)
 
-            # Emit frame for grid view
-            self.frame_ready.emit(stream_id, frame)
+        except Exception as e:
+            self.error_occurred.emit(f"Stream {stream_id} error: {str(e)}")
+            return False
+        return True
 
-            # Emit for main view if this is the active stream
-            if stream_id == self._active_stream_id:
-                self.active_frame_ready.emit(frame)
+    def _dispatch_frame(self, stream_id, frame):
+        # Emit frame for grid view, reduced once here to the cell size. In single view nothing shows
+        # grid frames, so skip the resize and the signal altogether.
+        if self._grid_mode:
+            self._publish(stream_id, self._fit(stream_id, "grid", frame, self._target_sizes.get(stream_id)))
 
-                # Handle recording
-                if self._recording and not self._paused and self._writer:
-                    self._writer.write(frame)
+        # Emit for main view if this is the active stream, reduced here to the label size so the
+        # GUI thread only has to blit it
+        if stream_id == self._active_stream_id:
+            self._publish_active(self._fit(stream_id, "main", frame, self._main_size))
 
-        except Exception as e:
-            self.error_occurred.emit(f"Stream {stream_id} error: {str(e)}")
+            # Handle recording
+            if self._recording:
+                with QMutexLocker(self._rec_mutex):
+                    if self._recording and not self._paused and self._recorder:
+                        # Held in the pool until the writer thread has written it
+                        with QMutexLocker(self._frame_mutex):
+                            self._ref(frame)
+                        self._recorder.push(frame)
+
+    def _acquire_buffer(self, stream_id):
+        """A buffer to decode into, or None to let retrieve() allocate one until the frame size is known"""
+        with QMutexLocker(self._frame_mutex):
+            free = self._free_buffers.get(stream_id)
+            if free:
+                return free.pop()
+            shape = self._frame_shapes.get(stream_id)
+        return _alloc_frame(shape) if shape else None
+
+    def _hold(self, stream_id, frame):
+        with QMutexLocker(self._frame_mutex):
+            self._buffer_refs[id(frame)] = [frame, stream_id, 1]
+            self._frame_shapes[stream_id] = frame.shape
+
+    def _ref(self, frame):
+        entry = self._buffer_refs.get(id(frame))
+        if entry and entry[0] is frame:
+            entry[2] += 1
+
+    def _unref(self, frame):
+        entry = self._buffer_refs.get(id(frame))
+        if not entry or entry[0] is not frame:
+            return
+        entry[2] -= 1
+        if entry[2] == 0:
+            del self._buffer_refs[id(frame)]
+            free = self._free_buffers.setdefault(entry[1], [])
+            if len(free) < _POOL_SIZE:
+                free.append(frame)
+
+    def release_frame(self, frame):
+        """Hand a frame obtained from take_frame()/take_active_frame() back to the pool"""
+        with QMutexLocker(self._frame_mutex):
+            self._unref(frame)
+
+    def _publish(self, stream_id, frame):
+        with QMutexLocker(self._frame_mutex):
+            old = self._latest_frames.get(stream_id)
+            self._latest_frames[stream_id] = frame
+            self._ref(frame)
+            if old is not None:
+                self._unref(old)
+        if old is None:
+            self.frame_available.emit(stream_id)
+
+    def _publish_active(self, frame):
+        with QMutexLocker(self._frame_mutex):
+            old, self._latest_active = self._latest_active, frame
+            self._ref(frame)
+            if old is not None:
+                self._unref(old)
+        if old is None:
+            self.active_frame_available.emit()
+
+    def take_frame(self, stream_id):
+        """Return and clear the latest grid frame for stream_id, or None if there is none"""
+        with QMutexLocker(self._frame_mutex):
+            return self._latest_frames.pop(stream_id, None)
+
+    def take_active_frame(self):
+        """Return and clear the latest main-view frame, or None if there is none"""
+        with QMutexLocker(self._frame_mutex):
+            frame, self._latest_active = self._latest_active, None
+            return frame
+
+    def _fit(self, stream_id, view, frame, size):
+        """frame downscaled to size (w, h), or frame itself if that would not reduce it"""
+        h, w = frame.shape[:2]
+        if not size or size[0] <= 0 or size[1] <= 0 or size[0] * size[1] >= w * h:
+            return frame
+        return self._resize((stream_id, view), frame, size)
+
+    def _resize(self, key, frame, size):
+        if not _CUDA_ENABLED:
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+        gpu = self._gpu.get(key)
+        if gpu is None:
+            gpu = self._gpu[key] = (cv2.cuda_Stream(), cv2.cuda_GpuMat(), cv2.cuda_GpuMat())
+        stream, src, dst = gpu
+        # GpuMats only reallocate when the frame or cell size changes
+        src.upload(frame, stream)
+        cv2.cuda.resize(src, size, dst, interpolation=cv2.INTER_AREA, stream=stream)
+        resized = dst.download(stream)
+        stream.waitForCompletion()
+        return resized
 
     def _cleanup(self):
-        with QMutexLocker(self._mutex):
-            for stream_id, cap in self._caps.items():
-                if cap and cap.isOpened():
-                    cap.release()
-            self._caps.clear()
+        # Captures are released by their readers, which may still be finishing a blocking grab();
+        # _drop_cap releases any whose reader is already gone
+        with QMutexLocker(self._url_mutex):
+            stream_ids = list(self._urls)
             self._urls.clear()
+        with QReadLocker(self._caps_lock):
+            stream_ids.extend(stream_id for stream_id in self._caps if stream_id not in stream_ids)
+        for stream_id in stream_ids:
+            self._drop_cap(stream_id)
 
-        if self._writer:
-            self._writer.release()
-        self._writer = None
+        with QMutexLocker(self._rec_mutex):
+            recorder, self._recorder = self._recorder, None
+        if recorder:
+            recorder.stop()
 
     def stop(self):
         self._running = False
-        self._cleanup()
+        self._generation += 1
+        self._streams_changed.set()
         self.wait(2000)
+        self._cleanup()
 
 
 class VideoGridWidget(QWidget):
@@ -207,6 +585,15 @@ class VideoGridWidget(QWidget):
         self.setLayout(self.grid_layout)
         self.video_widgets = []
 
+        # Frames are coalesced per cell and drawn together at most once per ~16 ms
+        self._pending = {}  # index -> latest undrawn frame
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setTimerType(Qt.PreciseTimer)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(16)
+        self._flush_timer.timeout.connect(self._flush)
+        self.frame_done = None  # called with each frame once it has been drawn or superseded
+
     def setup_grid(self, rows, cols):
         # Clear existing widgets
         for i in reversed(range(self.grid_layout.count())):
@@ -221,7 +608,7 @@ class VideoGridWidget(QWidget):
         # Create video widgets for each grid cell
         for row in range(rows):
             for col in range(cols):
-                video_widget = QLabel()
+                video_widget = VideoLabel()
                 video_widget.setAlignment(Qt.AlignCenter)
                 video_widget.setText(f"Camera {row * cols + col + 1}")
                 video_widget.setStyleSheet("""
@@ -246,40 +633,55 @@ class VideoGridWidget(QWidget):
                 self.grid_layout.addWidget(video_widget, row, col)
                 self.video_widgets.append(video_widget)
 
+    def cell_size(self, index):
+        if index < len(self.video_widgets):
+            return self.video_widgets[index].width(), self.video_widgets[index].height()
+        return None
+
     def cell_clicked(self, index):
         # Handle cell click to focus on a specific camera
         if self.parent and hasattr(self.parent, 'focus_on_camera'):
             self.parent.focus_on_camera(index)
 
     def update_frame(self, index, frame):
+        # Queue the frame for the next flush, replacing any frame the cell has not drawn yet
+        old = self._pending.get(index)
+        self._pending[index] = frame
+        if old is not None and self.frame_done:
+            self.frame_done(old)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        for index, frame in pending.items():
+            self._draw_frame(index, frame)
+            if self.frame_done:
+                self.frame_done(frame)
+
+    def _draw_frame(self, index, frame):
         # Update a specific cell with a new frame
         if index < len(self.video_widgets):
             try:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_frame.shape
-                bytes_per_line = ch * w
-                q_img = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(q_img)
-
-                # Scale to fit the cell while maintaining aspect ratio
-                self.video_widgets[index].setPixmap(
-                    pixmap.scaled(
-                        self.video_widgets[index].width(),
-                        self.video_widgets[index].height(),
-                        Qt.IgnoreAspectRatio,  # Fill the entire cell
-                        Qt.SmoothTransformation
-                    )
-                )
+                # Scaled to fill the entire cell
+                cell = self.video_widgets[index]
+                pixmap = cell.frame_pixmap(frame)
+                if pixmap is not None:
+                    cell.setPixmap(pixmap)
             except Exception as e:
                 print(f"Error updating grid cell {index}: {e}")
 
 
 class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
+    _CHAN_RE = re.compile(r'channel=(\d+)')
+    _STRM_RE = re.compile(r'stream=(\d+)')
+
     def __init__(self, parent=None):
         super().__init__(parent)  # Fixed: Proper parent initialization
         self.parent = parent
         self.worker = VideoWorker()
         self.grid_widget = VideoGridWidget(self)  # Fixed: Pass self as parent
+        self.grid_widget.frame_done = self.worker.release_frame
         self._setup_ui()
         self._connect_signals()
         self.available_streams = []
@@ -288,9 +690,26 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
         self.stream_buttons = []
         self.current_stream_index = 0
 
+        # Recording indicators rendered once and blitted onto frames
+        self._rec_overlay = self._render_overlay("REC ●", Qt.red, 40)
+        self._paused_overlay = self._render_overlay("PAUSED ⏸", Qt.yellow, 10)
+
+    @staticmethod
+    def _render_overlay(text, color, x):
+        """Transparent 160x40 strip holding text, meant for the top-right corner of a frame"""
+        overlay = QPixmap(160, 40)
+        overlay.fill(Qt.transparent)
+        painter = QPainter(overlay)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(color)
+        painter.setFont(QFont("Arial", 18, QFont.Bold))
+        painter.drawText(x, 30, text)
+        painter.end()
+        return overlay
+
     def _setup_ui(self):
         # Main video label for single view
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setText("No video stream connected")
         self.video_label.setStyleSheet("""
@@ -353,12 +772,12 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
         """Extract meaningful name from RTSP URL"""
         try:
             if 'channel=' in rtsp_url:
-                match = re.search(r'channel=(\d+)', rtsp_url)
+                match = self._CHAN_RE.search(rtsp_url)
                 if match:
                     return f"Ch{match.group(1)}"
 
             if 'stream=' in rtsp_url:
-                match = re.search(r'stream=(\d+)', rtsp_url)
+                match = self._STRM_RE.search(rtsp_url)
                 if match:
                     return f"Strm{match.group(1)}"
 
@@ -373,6 +792,7 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
 
     def toggle_view_mode(self, checked):
         self.grid_mode = checked
+        self.worker.set_grid_mode(checked)
         if checked:
             self.stacked_widget.setCurrentIndex(1)
             self.view_toggle_btn.setText("Single View")
@@ -410,6 +830,7 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
             self.view_toggle_btn.setChecked(False)
             self.view_toggle_btn.setText("Grid View")
             self.grid_mode = False
+            self.worker.set_grid_mode(False)
             self.set_active_button(index)
 
     def _switch_to_stream(self, stream_id):
@@ -440,8 +861,8 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
                 btn.setChecked(i == stream_id)
 
     def _connect_signals(self):
-        self.worker.frame_ready.connect(self._update_grid_frame)
-        self.worker.active_frame_ready.connect(self._update_main_frame)
+        self.worker.frame_available.connect(self._update_grid_frame)
+        self.worker.active_frame_available.connect(self._update_main_frame)
         self.worker.connection_status.connect(self._update_connection_status)
         self.worker.error_occurred.connect(self._handle_error)
 
@@ -485,41 +906,41 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
         for i, btn in enumerate(self.stream_buttons):
             btn.setChecked(i == stream_id)
 
-    @Slot(int, np.ndarray)
-    def _update_grid_frame(self, stream_id, frame):
+    @Slot(int)
+    def _update_grid_frame(self, stream_id):
+        # Always take the frame so the worker signals the next one
+        frame = self.worker.take_frame(stream_id)
+        if frame is None:
+            return
         if self.grid_mode:
-            self.grid_widget.update_frame(stream_id, frame)
+            self.worker.set_target_size(stream_id, self.grid_widget.cell_size(stream_id))
+            self.grid_widget.update_frame(stream_id, frame)  # released by the grid once drawn
+        else:
+            self.worker.release_frame(frame)
 
-    @Slot(np.ndarray)
-    def _update_main_frame(self, frame):
+    @Slot()
+    def _update_main_frame(self):
+        frame = self.worker.take_active_frame()
+        if frame is None:
+            return
+        dpr = self.video_label.devicePixelRatioF()
+        self.worker.set_main_size((int(self.video_label.width() * dpr), int(self.video_label.height() * dpr)))
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_frame.shape
-            bytes_per_line = ch * w
-            q_img = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_img)
+            # Scaled to fill the entire space
+            try:
+                pixmap = self.video_label.frame_pixmap(frame)
+            finally:
+                self.worker.release_frame(frame)
+            if pixmap is None:
+                return
 
             if hasattr(self.worker, '_recording') and self.worker._recording:
                 painter = QPainter(pixmap)
-                painter.setRenderHint(QPainter.Antialiasing)
-                if not self.worker._paused:
-                    painter.setPen(Qt.red)
-                    painter.setFont(QFont("Arial", 18, QFont.Bold))
-                    painter.drawText(pixmap.width() - 120, 30, "REC ●")
-                else:
-                    painter.setPen(Qt.yellow)
-                    painter.setFont(QFont("Arial", 18, QFont.Bold))
-                    painter.drawText(pixmap.width() - 150, 30, "PAUSED ⏸")
+                painter.drawPixmap(self.video_label.width() - 160, 0,
+                                   self._paused_overlay if self.worker._paused else self._rec_overlay)
                 painter.end()
 
-            self.video_label.setPixmap(
-                pixmap.scaled(
-                    self.video_label.width(),
-                    self.video_label.height(),
-                    Qt.IgnoreAspectRatio,  # Fill the entire space
-                    Qt.SmoothTransformation
-                )
-            )
+            self.video_label.setPixmap(pixmap)
         except Exception as e:
             self._handle_error(f"Frame error: {str(e)}")
 
@@ -596,7 +1017,8 @@ class RTSPVideoStream(QWidget):  # Fixed: Now inherits from QWidget
                 self.parent.pause_record.setEnabled(True)
                 self.parent.resume_record.setEnabled(False)
                 self.parent.stop_record.setEnabled(True)
-                self.parent.statusBar().showMessage(f"Recording started: {new_filename}")
+                self.parent.statusBar().showMessage(
+                    f"Recording started: {new_filename} [{self.worker.recording_codec}]")
 
         except Exception as e:
             self._handle_error(str(e))
@@ -2,23 +2,50 @@ import os
 import sys
 import time
 import math
+import threading
+from collections import deque
 from typing import Dict, List
 
 import cv2
 import numpy as np
 from PySide6.QtCore import Qt, QThread, Signal, QObject, QTimer, QSize
-from PySide6.QtGui import QImage, QPixmap, QPainter, QFont, QAction, QShortcut, QKeySequence
+from PySide6.QtGui import QImage, QPixmap, QPainter, QFont, QFontMetrics, QAction, QShortcut, QKeySequence
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout,
     QPushButton, QFileDialog, QStackedWidget, QMainWindow, QSizePolicy
 )
 
 
+_FOURCC_MP4V = cv2.VideoWriter_fourcc(*"mp4v")
+_FOURCC_XVID = cv2.VideoWriter_fourcc(*"XVID")
+
+# RTP depayloader + decoder per codec, tried in order until one negotiates with the camera
+_GST_HW_DECODERS = (
+    ("rtph264depay", "nvh264dec"),
+    ("rtph264depay", "vaapih264dec"),
+    ("rtph265depay", "nvh265dec"),
+    ("rtph265depay", "vaapih265dec"),
+)
+_GST_DECODERS = (
+    ("rtph264depay", "avdec_h264"),
+    ("rtph265depay", "avdec_h265"),
+)
+
+
+def _gstreamer_pipeline(url: str, depay: str, decoder: str) -> str:
+    # appsink keeps only the newest buffer, replacing OpenCV's own frame queue.
+    # The URL is quoted so '!', spaces or '&' in credentials/query strings don't split the launch line.
+    location = url.replace("\\", "\\\\").replace('"', '\\"')
+    return (f'rtspsrc location="{location}" latency=0 ! '
+            f"{depay} ! {decoder} ! videoconvert ! "
+            "video/x-raw,format=BGR ! appsink drop=true sync=false max-buffers=1")
+
+
 # -----------------------------
 # Per-stream capture worker
 # -----------------------------
 class VideoWorker(QThread):
-    frame_ready = Signal(int, np.ndarray)         # (stream_id, frame BGR)
+    frame_ready = Signal(int)                     # (stream_id), fetch the image with take_frame()
     status = Signal(int, bool, str)               # (stream_id, ok, message)
     error = Signal(int, str)                      # (stream_id, message)
 
@@ -30,17 +57,70 @@ class VideoWorker(QThread):
         self._cap = None
 
         # Tuneables
+        self.hw_accel = True
         self._max_failures = 50
-        self._sleep_between_loops_ms = 1
+        self._target_fps: float | None = None   # None decodes every frame, 0 only grabs
+        self._last_emit_ts = 0.0
+        self._target_size: tuple[int, int] | None = None  # (w, h) to downscale to before emitting
+        self._recorder: RecordingWriter | None = None  # receives full-res frames while set
+        self._overlay = None  # callable painting onto the display image, run on this thread
+        self.frame_size: tuple[int, int] | None = None  # (w, h) of the source stream
+
+        # Latest display image; frame_ready is only emitted again once the GUI has taken it
+        self._frame_lock = threading.Lock()
+        self._latest: QImage | None = None
+        self._pending = False
+
+    def set_target_fps(self, fps: float | None):
+        self._target_fps = fps
+
+    def set_target_size(self, size: tuple[int, int] | None):
+        self._target_size = size
+
+    def set_recorder(self, recorder: "RecordingWriter | None"):
+        self._recorder = recorder
+
+    def take_frame(self) -> QImage | None:
+        with self._frame_lock:
+            img, self._latest = self._latest, None
+            self._pending = False
+        return img
+
+    def set_overlay(self, draw):
+        self._overlay = draw
+
+    def _open_gstreamer(self):
+        if not self.url.startswith("rtsp") or not cv2.videoio_registry.hasBackend(cv2.CAP_GSTREAMER):
+            return None
+        decoders = _GST_HW_DECODERS + _GST_DECODERS if self.hw_accel else _GST_DECODERS
+        for depay, decoder in decoders:
+            cap = cv2.VideoCapture(_gstreamer_pipeline(self.url, depay, decoder), cv2.CAP_GSTREAMER)
+            if cap.isOpened():
+                return cap
+            cap.release()
+        return None
 
     def _open(self) -> bool:
         try:
-            # Try FFMPEG first
-            cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
-            try:
-                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            except Exception:
-                pass
+            # Try GStreamer first, it hands decoded buffers straight to appsink
+            cap = self._open_gstreamer()
+
+            if cap is None and self.hw_accel:
+                # NVDEC/VAAPI/D3D11/VideoToolbox, whichever the OpenCV build and machine provide
+                cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG, [
+                    cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                    cv2.CAP_PROP_HW_DEVICE, 0,
+                ])
+                if not cap.isOpened():
+                    cap.release()
+                    cap = None
+
+            if cap is None:
+                cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
+                try:
+                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                except Exception:
+                    pass
 
             if not cap.isOpened():
                 cap.release()
@@ -69,22 +149,38 @@ class VideoWorker(QThread):
                     continue
                 backoff = 0.5
 
+            # Hot-loop lookups bound to locals once per connection rather than per frame
+            cap = self._cap
+            grab, retrieve, is_opened = cap.grab, cap.retrieve, cap.isOpened
+            monotonic = time.monotonic
+            frame_lock = self._frame_lock
+            stream_id = self.stream_id
+
             failures = 0
-            while self._running and self._cap and self._cap.isOpened():
-                grabbed = self._cap.grab()
+            while self._running and is_opened():
+                grabbed = grab()
                 if not grabbed:
                     failures += 1
                     if failures >= self._max_failures:
-                        self.status.emit(self.stream_id, False, "Too many grab() failures")
+                        self.status.emit(stream_id, False, "Too many grab() failures")
                         break
                     time.sleep(0.01)
                     continue
 
-                ok, frame = self._cap.retrieve()
+                # Keep grabbing to drain the stream, but only decode as often as the UI shows it
+                fps = self._target_fps
+                if fps is not None:
+                    now = monotonic()
+                    if fps <= 0 or now - self._last_emit_ts < 1.0 / fps:
+                        failures = 0
+                        continue
+                    self._last_emit_ts = now
+
+                ok, frame = retrieve()
                 if not ok or frame is None:
                     failures += 1
                     if failures >= self._max_failures:
-                        self.status.emit(self.stream_id, False, "Too many retrieve() failures")
+                        self.status.emit(stream_id, False, "Too many retrieve() failures")
                         break
                     time.sleep(0.01)
                     continue
@@ -92,8 +188,30 @@ class VideoWorker(QThread):
                 if failures:
                     failures = 0
 
-                self.frame_ready.emit(self.stream_id, frame)
-                self.msleep(self._sleep_between_loops_ms)
+                self.frame_size = (frame.shape[1], frame.shape[0])
+                recorder = self._recorder
+                if recorder is not None:
+                    recorder.push(frame)
+
+                size = self._target_size
+                if size and size[0] < frame.shape[1] and size[1] < frame.shape[0]:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+                # Build the display image here so the GUI thread only has to upload it.
+                # copy() detaches it from the ndarray, which is freed once this loop moves on.
+                h, w = frame.shape[:2]
+                img = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888).copy()
+                draw = self._overlay
+                if draw is not None:
+                    draw(img)
+                # Coalesce: while the GUI is behind, newer images replace the queued one instead of
+                # piling up one queued signal per frame. No sleep: grab() already blocks.
+                with frame_lock:
+                    self._latest = img
+                    notify = not self._pending
+                    self._pending = True
+                if notify:
+                    self.frame_ready.emit(stream_id)
 
             # Close & retry
             if self._cap and self._cap.isOpened():
@@ -114,6 +232,71 @@ class VideoWorker(QThread):
         self.wait(1500)
 
 
+# -----------------------------
+# Recording writer
+# -----------------------------
+class RecordingWriter(QThread):
+    """Feeds a cv2.VideoWriter from a ring of preallocated frames so disk stalls never block the GUI thread.
+    When the ring is full the oldest queued frame is dropped. The writer is released when the thread ends."""
+
+    def __init__(self, writer: cv2.VideoWriter, frame_size: tuple[int, int], slots: int = 30,
+                 parent: QObject | None = None):
+        super().__init__(parent)
+        w, h = frame_size
+        self._writer = writer
+        self._free = [np.empty((h, w, 3), np.uint8) for _ in range(slots)]
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._overflowing = False
+
+    def push(self, frame_bgr: np.ndarray):
+        with self._cond:
+            if self._free:
+                buf = self._free.pop()
+                self._overflowing = False
+            else:
+                buf = self._queue.popleft()
+                if not self._overflowing:
+                    print("Recording buffer full, dropping oldest frames")
+                    self._overflowing = True
+
+        # The buffer is ours until queued, so copy outside the lock
+        if frame_bgr.shape != buf.shape:
+            cv2.resize(frame_bgr, (buf.shape[1], buf.shape[0]), dst=buf)
+        else:
+            np.copyto(buf, frame_bgr)
+
+        with self._cond:
+            self._queue.append(buf)
+            self._cond.notify()
+
+    def run(self):
+        try:
+            while True:
+                with self._cond:
+                    while self._running and not self._queue:
+                        self._cond.wait()
+                    if not self._queue:
+                        break
+                    buf = self._queue.popleft()
+                try:
+                    self._writer.write(buf)
+                except Exception as e:
+                    print(f"Write error: {e}")
+                with self._cond:
+                    self._free.append(buf)
+        finally:
+            self._writer.release()
+
+    def stop(self):
+        # Writes out whatever is still queued before returning
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self.wait()
+
+
 # -----------------------------
 # Grid widget (previews only)
 # -----------------------------
@@ -124,6 +307,7 @@ class VideoGridWidget(QWidget):
         self.grid.setSpacing(2)
         self.grid.setContentsMargins(0, 0, 0, 0)
         self.cells: Dict[int, QLabel] = {}   # stream_id -> QLabel
+        self._pixmaps: Dict[int, List[QPixmap]] = {}  # stream_id -> two reusable pixmaps
 
     def _make_label(self, text: str) -> QLabel:
         lab = QLabel(text)
@@ -143,42 +327,68 @@ class VideoGridWidget(QWidget):
         return lab
 
     def set_streams(self, stream_ids: List[int], names: Dict[int, str]):
-        # Clear grid
-        for i in reversed(range(self.grid.count())):
-            w = self.grid.itemAt(i).widget()
-            if w:
-                w.setParent(None)
-        self.cells.clear()
-
-        n = len(stream_ids)
-        if n == 0:
-            return
+        # Rebuild with updates off so the layout is recomputed once, not per removed/added cell
+        self.setUpdatesEnabled(False)
+        try:
+            # Clear grid
+            for i in reversed(range(self.grid.count())):
+                w = self.grid.itemAt(i).widget()
+                if w:
+                    w.setParent(None)
+            self.cells.clear()
+            self._pixmaps.clear()
+
+            n = len(stream_ids)
+            if n == 0:
+                return
+
+            rows = math.isqrt(n - 1) + 1  # ceil(sqrt(n)) without going through float
+            cols = -(-n // rows)
+
+            labels = [self._make_label(names.get(sid) or f"Cam {sid}") for sid in stream_ids]
+            for idx, (sid, label) in enumerate(zip(stream_ids, labels)):
+                self.grid.addWidget(label, idx // cols, idx % cols)
+                self.cells[sid] = label
+        finally:
+            self.setUpdatesEnabled(True)
 
-        rows = int(math.ceil(math.sqrt(n)))
-        cols = int(math.ceil(n / rows))
+    def cell_size(self, stream_id: int) -> tuple[int, int] | None:
+        lab = self.cells.get(stream_id)
+        return (lab.width(), lab.height()) if lab else None
 
-        for idx, sid in enumerate(stream_ids):
-            r, c = divmod(idx, cols)
-            label = self._make_label(names.get(sid, f"Cam {sid}"))
-            self.grid.addWidget(label, r, c)
-            self.cells[sid] = label
+    def cell_exposed(self, stream_id: int) -> bool:
+        # False for cells that are hidden, scrolled out of view, covered, or in a minimized window
+        lab = self.cells.get(stream_id)
+        return lab is not None and not lab.visibleRegion().isEmpty()
 
     def set_click_handler(self, handler):
         # Assign mousePressEvent with bound stream_id
         for sid, lab in self.cells.items():
             lab.mousePressEvent = (lambda ev, s=sid: handler(s))
 
-    def update_frame(self, stream_id: int, frame_bgr: np.ndarray):
+    def _next_pixmap(self, stream_id: int) -> QPixmap:
+        # Alternate two pixmaps so the one being refilled is never the one the label still shares,
+        # which would force a detach (and a fresh allocation) on write
+        pair = self._pixmaps.get(stream_id)
+        if pair is None:
+            pair = self._pixmaps[stream_id] = [QPixmap(), QPixmap()]
+        pair.reverse()
+        return pair[0]
+
+    def update_frame(self, stream_id: int, img: QImage):
         lab = self.cells.get(stream_id)
         if not lab:
             return
         try:
-            rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-            pix = QPixmap.fromImage(qimg)
-            # Fill cell (ignore aspect ratio to fully occupy)
-            lab.setPixmap(pix.scaled(lab.width(), lab.height(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+            if (img.width(), img.height()) == (lab.width(), lab.height()):
+                # Already cell-sized by the worker: refill a pixmap in place instead of allocating one
+                pix = self._next_pixmap(stream_id)
+                pix.convertFromImage(img)
+                lab.setPixmap(pix)
+            else:
+                # Fill cell (ignore aspect ratio to fully occupy)
+                pix = QPixmap.fromImage(img)
+                lab.setPixmap(pix.scaled(lab.width(), lab.height(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
         except Exception as e:
             # Keep cell text on error
             print(f"Grid update error [{stream_id}]: {e}")
@@ -188,6 +398,10 @@ class VideoGridWidget(QWidget):
 # Main video widget (single + grid)
 # -----------------------------
 class RTSPVideoStream(QWidget):
+    # Decode rate for grid cells other than the active stream, which always decodes every frame
+    GRID_FPS = 15.0
+    OFFSCREEN_FPS = 2.0
+
     def __init__(self, parent: QWidget | None = None):
         super().__init__(parent)
         # UI elements
@@ -230,10 +444,11 @@ class RTSPVideoStream(QWidget):
         self.workers: Dict[int, VideoWorker] = {}
         self.stream_urls: Dict[int, str] = {}
         self.stream_names: Dict[int, str] = {}
+        self._stream_order: List[int] = []  # stream ids in display order, kept in step with stream_urls
         self.active_stream_id: int | None = None
 
         # Recording state (active stream only)
-        self._writer: cv2.VideoWriter | None = None
+        self._rec_writer: RecordingWriter | None = None
         self._recording = False
         self._paused = False
         self._rec_base_dir = ""
@@ -241,10 +456,12 @@ class RTSPVideoStream(QWidget):
         self._rec_ext = ".mp4"
         self._rec_index = 0
         self._fps = 20.0
-        self._last_raw_frame: np.ndarray | None = None  # latest raw BGR from active worker
 
         # Blink timer for REC dot
         self._blink = False
+        self._overlay_rec_on = self._render_overlay(False, True)
+        self._overlay_rec_off = self._render_overlay(False, False)
+        self._overlay_pause = self._render_overlay(True, False)
         self._blink_timer = QTimer(self)
         self._blink_timer.timeout.connect(self._toggle_blink)
         self._blink_timer.start(500)
@@ -274,6 +491,7 @@ class RTSPVideoStream(QWidget):
             for i, url in enumerate(urls):
                 self.stream_urls[i] = url
                 self.stream_names[i] = self._infer_name(url)
+        self._stream_order = list(self.stream_urls)
 
         # Create workers
         for sid, url in self.stream_urls.items():
@@ -309,7 +527,7 @@ class RTSPVideoStream(QWidget):
                 w.setParent(None)
 
         # Build
-        for sid in sorted(self.stream_urls.keys()):
+        for sid in self._stream_order:
             btn = QPushButton(self.stream_names.get(sid, f"Cam {sid}"))
             btn.setCheckable(True)
             btn.clicked.connect(lambda checked, s=sid: self.set_active_stream(s))
@@ -324,13 +542,12 @@ class RTSPVideoStream(QWidget):
         for i in range(self.buttons_bar.count()):
             w = self.buttons_bar.itemAt(i).widget()
             if isinstance(w, QPushButton):
-                sid = sorted(self.stream_urls.keys())[idx]
+                sid = self._stream_order[idx]
                 w.setChecked(sid == self.active_stream_id)
                 idx += 1
 
     def _rebuild_grid(self):
-        ids = sorted(self.stream_urls.keys())
-        self.grid_widget.set_streams(ids, self.stream_names)
+        self.grid_widget.set_streams(self._stream_order, self.stream_names)
         self.grid_widget.set_click_handler(self._on_grid_click)
 
     def _on_grid_click(self, stream_id: int):
@@ -343,65 +560,100 @@ class RTSPVideoStream(QWidget):
     def _toggle_view(self, checked: bool):
         self.stack.setCurrentIndex(1 if checked else 0)
         self.view_btn.setText("Single View" if checked else "Grid View")
+        self._configure_workers()
 
     def set_active_stream(self, stream_id: int):
         if stream_id not in self.stream_urls:
             return
         self.active_stream_id = stream_id
         self._refresh_button_checks()
+        self._configure_workers()
+
+    def set_target_fps(self, stream_id: int, fps: float | None):
+        w = self.workers.get(stream_id)
+        if w:
+            w.set_target_fps(fps)
+
+    def _configure_workers(self):
+        # Active stream feeds the single view and the recorder; the rest are only seen in the grid.
+        # The recorder gets full-res frames separately, so in grid view every stream is decoded to its cell.
+        grid = self.stack.currentIndex() == 1
+        for sid, w in self.workers.items():
+            active = sid == self.active_stream_id
+            if active:
+                self.set_target_fps(sid, None)
+            else:
+                self.set_target_fps(sid, self.GRID_FPS if grid else 0)
+            if grid:
+                w.set_target_size(self.grid_widget.cell_size(sid))
+            elif active:
+                w.set_target_size(None)  # refitted to the single view on its first frame
+            w.set_recorder(self._rec_writer if active and self._recording and not self._paused else None)
+            # Overlays only go on the single-view preview
+            w.set_overlay(self._draw_overlay if active and self._recording and not grid else None)
 
     def get_video_widget(self):
         return self  # Fixed: Return self since we're now a QWidget
 
     # ---------- Frame handling ----------
-    def _on_frame(self, stream_id: int, frame_bgr: np.ndarray):
-        # Grid preview (always)
-        if self.stack.currentIndex() == 1:
-            self.grid_widget.update_frame(stream_id, frame_bgr)
+    def _on_frame(self, stream_id: int):
+        w = self.workers.get(stream_id)
+        img = w.take_frame() if w else None
+        if img is None:
+            return
 
-        # Single preview (only active)
-        if stream_id == self.active_stream_id:
-            # keep raw for recording
-            self._last_raw_frame = frame_bgr
+        # Only what is actually on screen is painted; recording is fed by the worker either way
 
-            # Build preview pixmap
+        # Grid preview
+        if self.stack.currentIndex() == 1:
+            exposed = self.grid_widget.cell_exposed(stream_id)
+            if stream_id != self.active_stream_id:
+                # Off-screen cells are only sampled, often enough to notice when they come back into view
+                self.set_target_fps(stream_id, self.GRID_FPS if exposed else self.OFFSCREEN_FPS)
+            if exposed:
+                self.grid_widget.update_frame(stream_id, img)
+                # Have the worker downscale to the cell before building the image (picks up cell resizes too)
+                size = self.grid_widget.cell_size(stream_id)
+                if size and (img.width(), img.height()) != size:
+                    self.workers[stream_id].set_target_size(size)
+
+        # Single preview (only active); overlays were already drawn by the worker
+        elif stream_id == self.active_stream_id and not self.single_label.visibleRegion().isEmpty():
             try:
-                rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-                pix = QPixmap.fromImage(qimg)
-
-                # Draw overlays only on preview
-                if self._recording:
-                    pix = self._draw_overlay(pix)
-
-                self.single_label.setPixmap(
-                    pix.scaled(self.single_label.width(), self.single_label.height(),
-                               Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                )
+                label_size = self.single_label.size()
+                if w.frame_size:
+                    # Have the worker fit the frame to the label with INTER_AREA (downscale only)
+                    fit = QSize(*w.frame_size).scaled(label_size, Qt.KeepAspectRatio)
+                    w.set_target_size((fit.width(), fit.height()))
+
+                pix = QPixmap.fromImage(img)
+                if img.size() != img.size().scaled(label_size, Qt.KeepAspectRatio):
+                    # Residual fit while the worker catches up with a resize; only upscaling needs filtering
+                    mode = Qt.FastTransformation if img.width() > label_size.width() or \
+                        img.height() > label_size.height() else Qt.SmoothTransformation
+                    pix = pix.scaled(label_size, Qt.KeepAspectRatio, mode)
+                self.single_label.setPixmap(pix)
             except Exception as e:
                 self._on_error(stream_id, f"Preview error: {e}")
 
-            # Write to file if recording & not paused (write raw frame)
-            if self._recording and not self._paused and self._writer is not None:
-                try:
-                    self._writer.write(self._last_raw_frame)
-                except Exception as e:
-                    self._on_error(stream_id, f"Write error: {e}")
-
-    def _draw_overlay(self, pix: QPixmap) -> QPixmap:
-        # Renders right-aligned REC/PAUSE indicators. No Unicode symbols; draw shapes.
-        p = QPainter(pix)
-        p.setRenderHint(QPainter.Antialiasing)
-        p.setFont(QFont("Arial", 18, QFont.Bold))
-
+    @staticmethod
+    def _render_overlay(paused: bool, dot: bool) -> QImage:
+        # Renders a REC/PAUSE indicator sprite on a transparent background. No Unicode symbols; draw shapes.
+        font = QFont("Arial", 18, QFont.Bold)
+        metrics = QFontMetrics(font)
         margin = 14
-        text = "PAUSE" if self._paused else "REC"
-        metrics = p.fontMetrics()
+        text = "PAUSE" if paused else "REC"
         tw = metrics.horizontalAdvance(text)
         th = metrics.height()
 
-        x = pix.width() - tw - margin - 26  # room for icon
+        # Same placement as when it was painted per frame: icon, text, then the right-hand margin
+        sprite = QImage(26 + tw + margin + 26, th + margin, QImage.Format_ARGB32_Premultiplied)
+        sprite.fill(Qt.transparent)
+        p = QPainter(sprite)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setFont(font)
+
+        x = 26  # room for icon
         y = th + margin // 2
 
         # Text
@@ -409,25 +661,34 @@ class RTSPVideoStream(QWidget):
         p.drawText(x, y, text)
 
         # Icon
-        if self._paused:
+        p.setPen(Qt.NoPen)
+        if paused:
             # Yellow pause icon (two bars)
-            p.setPen(Qt.NoPen)
             p.setBrush(Qt.yellow)
             bx = x - 26
             by = y - th + 4
             bar_w, bar_h, gap = 6, th - 6, 6
             p.drawRect(bx, by, bar_w, bar_h)
             p.drawRect(bx + bar_w + gap, by, bar_w, bar_h)
-        else:
-            # Blinking red dot
-            p.setPen(Qt.NoPen)
-            p.setBrush(Qt.red if self._blink else Qt.transparent)
+        elif dot:
+            # Red dot (blink "on" phase)
+            p.setBrush(Qt.red)
             cx = x - 16
             cy = y - th // 2 + 3
             p.drawEllipse(cx, cy, 12, 12)
 
         p.end()
-        return pix
+        return sprite
+
+    def _draw_overlay(self, img: QImage):
+        # Called from the active worker's thread, so it only composites a prebuilt sprite into the given image
+        if self._paused:
+            sprite = self._overlay_pause
+        else:
+            sprite = self._overlay_rec_on if self._blink else self._overlay_rec_off
+        p = QPainter(img)
+        p.drawImage(img.width() - sprite.width(), 0, sprite)
+        p.end()
 
     def _toggle_blink(self):
         self._blink = not self._blink
@@ -480,50 +741,54 @@ class RTSPVideoStream(QWidget):
             return
         if not self._ensure_save_base():
             return
-        # We’ll create writer on first valid frame (when _last_raw_frame is ready)
-        # but often we already have one.
-        if self._last_raw_frame is None:
+        worker = self.workers.get(self.active_stream_id)
+        if worker and worker.frame_size is None:
             # Try waiting a tick for a frame
             QApplication.processEvents()
 
         filename = self._next_filename()
         # Determine frame size safely
-        if self._last_raw_frame is not None:
-            h, w = self._last_raw_frame.shape[:2]
-            size = (w, h)
+        if worker and worker.frame_size is not None:
+            size = worker.frame_size
         else:
             # fallback (will likely fix itself next frame)
             size = (1280, 720)
 
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v") if self._rec_ext.lower() == ".mp4" else cv2.VideoWriter_fourcc(*"XVID")
+        fourcc = _FOURCC_MP4V if self._rec_ext.lower() == ".mp4" else _FOURCC_XVID
         writer = cv2.VideoWriter(filename, fourcc, self._fps, size)
         if not writer.isOpened():
             self.single_label.setText("Failed to open writer.")
             return
 
-        self._writer = writer
+        self._rec_writer = RecordingWriter(writer, size, parent=self)
+        self._rec_writer.start()
         self._recording = True
         self._paused = False
+        self._configure_workers()
         self.single_label.setToolTip(f"Recording to {filename}")
 
     def pause_recording(self):
         if self._recording:
             self._paused = True
+            self._configure_workers()
 
     def resume_recording(self):
         if self._recording and self._paused:
             self._paused = False
+            self._configure_workers()
 
     def stop_recording(self):
         if not self._recording:
             return
+        # Detach the worker first so nothing is pushed after the writer drains
+        self._recording = False
+        self._paused = False
+        self._configure_workers()
         try:
-            if self._writer:
-                self._writer.release()
+            if self._rec_writer:
+                self._rec_writer.stop()
         finally:
-            self._writer = None
-            self._recording = False
-            self._paused = False
+            self._rec_writer = None
             self.single_label.setToolTip("")
 
     # ---------- Cleanup ----------
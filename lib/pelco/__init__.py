@@ -161,33 +161,59 @@ class AutofocusMode:
     ZOOM_TRIGGER = 'ZOOM_TRIGGER'
 
 
+_HEX_LUT = ["0x{:02X}".format(i) for i in range(256)]
+
+
 def bytes_to_string(btes):
     """ Takes a 'bytes' object and returns nicely formatted, spaced string like 0xFF 0x01 ... """
-    return ' '.join(["0x{:02x}".format(b).upper().replace('X', 'x') for b in btes])
+    return ' '.join([_HEX_LUT[b] for b in btes])
+
+
+# enum class -> (members, by public string, by protocol value), built on first use
+_enum_cache = {}
+
+
+def _get_cache(enum):
+    cached = _enum_cache.get(enum)
+    if cached is None:
+        members = [v for k, v in sorted(vars(enum).items()) if not (k.startswith('__') or k.endswith('__'))]
+        by_string, by_value = {}, {}
+        for m in members:
+            # Ambiguous keys resolve to None, as the old single-match scan did
+            try:
+                string, val = m[1], m[0]
+                by_string[string] = None if string in by_string else m
+                by_value[val] = None if val in by_value else m
+            except (TypeError, IndexError, KeyError):
+                continue
+        cached = _enum_cache[enum] = (members, by_string, by_value)
+    return cached
 
 
 def get_enum_list(enum):
     """ Return array of all enum members """
-    return [enum.__dict__[m] for m in dir(enum) if not (m.startswith('__') or m.endswith('__'))]
+    return list(_get_cache(enum)[0])
 
 
 def get_enum_from_string(enum, string):
     """ Provide the public string value and return the enum Tuple value -Assumes: (PROTOCOL_VALUE, PUBLIC_STRING) """
-    match = [enum.__dict__[m] for m in dir(enum) if
-             not (m.startswith('__') or m.endswith('__')) and enum.__dict__[m][1] == string]
-    return match[0] if len(match) == 1 else None
+    try:
+        return _get_cache(enum)[1].get(string)
+    except TypeError:
+        return None
 
 
 def get_enum_from_value(enum, val):
     """ Provide the protocol int / byte value and return the enum Tuple value -Assumes: (PROTOCOL_VALUE, PUBLIC_STRING) """
-    match = [enum.__dict__[m] for m in dir(enum) if not (m.startswith('__') or m.endswith('__')) \
-             and enum.__dict__[m][0] == val]
-    return match[0] if len(match) == 1 else None
+    try:
+        return _get_cache(enum)[2].get(val)
+    except TypeError:
+        return None
 
 
 def enum_has_value(enum, value):
     """ Return True if 'value' is within the 'enum' enumeration class """
-    return value in [enum.__dict__[mem] for mem in dir(enum) if not mem.startswith('__')]
+    return value in _get_cache(enum)[0]
 
 
 def success(data=None):
@@ -56,25 +56,200 @@ Example Extended message ([255, 2, 0, 75, 128, 128, 77]):
 """
 
 import binascii
+import sys
+import struct
 import time
 import inspect
-from queue import *
+import numpy as np
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+from queue import Queue, Empty
+from collections import deque
 from datetime import datetime
 from threading import Thread
-from . import Mode
-from . import *
-from . import __version__
+from . import (__version__, Mode, PelcoModel, ConnectionState, LogLevel, DEFAULT_CONFIG, KILL_CODE,
+               COMMAND_SIZE, SYNC_BYTE, SYNC_INDEX, EXTENDED_MAX_SPEED,
+               TYPE_STANDARD, TYPE_EXTENDED, TYPE_ALTERNATE, TYPE_STOP,
+               CMD1_FOCUS_NEAR, CMD1_IRIS_CLOSE, CMD1_IRIS_OPEN,
+               CMD2_FOCUS_FAR, CMD2_PAN_LEFT, CMD2_PAN_RIGHT, CMD2_TILT_DOWN, CMD2_TILT_UP,
+               CMD2_ZOOM_TELE, CMD2_ZOOM_WIDE,
+               EXT_CMD_SET_PRESET, EXT_CMD_CALL_PRESET, EXT_CMD_CLEAR_PRESET, EXT_CMD_SET_AUX, EXT_CMD_CLEAR_AUX,
+               EXT_CMD_SET_PAN, EXT_CMD_SET_TILT, EXT_CMD_SET_ZOOM, EXT_CMD_SET_MAGNIFICATION,
+               EXT_CMD_QUERY_PAN, EXT_CMD_QUERY_TILT, EXT_CMD_QUERY_ZOOM, EXT_CMD_QUERY_MAGNIFICATION,
+               EXT_CMD_QUERY_PAN_RESPONSE, EXT_CMD_QUERY_TILT_RESPONSE, EXT_CMD_QUERY_ZOOM_RESPONSE,
+               EXT_CMD_QUERY_MAGNIFICATION_RESPONSE,
+               ERR_BAD_PAN, ERR_BAD_TILT, ERR_BAD_VALUE, ERR_INVALID_INPUT_PARAM, ERR_NOT_READY,
+               ERR_NOT_SUPPORTED, ERR_SYNC, ERR_TIMEOUT,
+               get_enum_list, success, error)
+
+# Whole packet in one precompiled unpack rather than five separate index lookups
+_PACKET = struct.Struct('%dB' % COMMAND_SIZE)
+_PACKET_UNPACK_FROM = _PACKET.unpack_from
+
+# Offsets of the checksummed bytes (address through data2) relative to a sync byte
+_CHECKSUM_SPAN = np.arange(1, COMMAND_SIZE - 1)
+# Below this buffer length the plain Python scan beats NumPy's per-call overhead
+_VECTOR_SCAN_MIN = 32
+
+# Percent (0-100) to the 16-bit position used by zoom/magnification frames
+_PCT_TO_U16 = 0xFFFF / 100.0
+
+# Valid device models, checked on every construction
+_PELCO_MODELS = frozenset(get_enum_list(PelcoModel))
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _scan_packet_nb(buf, cmd_size):
+        """(index of the first sync byte followed by a valid checksum, index of the first sync byte), -1 if none"""
+        first = -1
+        for i in range(buf.shape[0]):
+            if buf[i] == 0xFF:
+                if first < 0:
+                    first = i
+                if i + cmd_size > buf.shape[0]:
+                    break
+                total = 0
+                for j in range(i + 1, i + cmd_size - 1):
+                    total += buf[j]
+                if total & 0xFF == buf[i + cmd_size - 1]:
+                    return i, first
+        return -1, first
+else:
+    _scan_packet_nb = None
+
+
+def _decode_standard(c1, c2):
+    """Returns (cmd_string, has_pan, has_tilt) for the bit fields of a standard command"""
+    cmd_string = ''
+    if c1 & 0x4:
+        cmd_string += 'C'
+    elif c1 & 0x2:
+        cmd_string += 'O'
+    if c1 & 0x1:
+        cmd_string += 'N'
+    elif c2 & 0x80:
+        cmd_string += 'F'
+    if c2 & 0x40:
+        cmd_string += 'W'
+    elif c2 & 0x20:
+        cmd_string += 'T'
+    if c2 & 0x10:
+        cmd_string += 'D'
+    if c2 & 0x8:
+        cmd_string += 'U'
+    if c2 & 0x4:
+        cmd_string += 'L'
+    if c2 & 0x2:
+        cmd_string += 'R'
+    return sys.intern(cmd_string), bool(c2 & 0x6), bool(c2 & 0x18)
+
+
+# Every standard command decoded up front, indexed by ((c1 & 7) << 8) | c2; equal
+# command strings share one interned object
+_STD_CMD_TABLE = tuple(_decode_standard(c1, c2) for c1 in range(8) for c2 in range(256))
+
+
+# Extended commands: query responses map straight to a full response, everything else to the 'data' value
+def _ext_pan_response(d1, d2):
+    pan = ((d1 << 8) + d2) / 100
+    return success(round(pan, 2))
+
+
+def _ext_tilt_response(d1, d2):
+    tilt = ((d1 << 8) + d2) / 100
+    if 0 <= tilt <= 90:
+        tilt = -tilt
+    elif 270 <= tilt <= 360:
+        tilt = 360 - tilt
+    else:
+        return error(ERR_BAD_VALUE)
+    return success(round(tilt, 2))
+
+
+def _round_div(n, d):
+    """n / d rounded half-up to an integer, without going through a float"""
+    return (2 * n + d) // (2 * d)
+
+
+def _ext_percent_response(d1, d2):
+    # Hundredths of a percent; same result as round(value / 0xFFFF * 100, 2) for every 16-bit value
+    return success(_round_div(((d1 << 8) + d2) * 10000, 0xFFFF) / 100)
+
+
+def _ext_id_value(d1, d2):
+    return d2
+
+
+def _ext_pan_value(d1, d2):
+    return ((d1 << 8) + d2) / 100
+
+
+def _ext_tilt_value(d1, d2):
+    value = ((d1 << 8) + d2) / 100
+    if 90 >= value >= 0:
+        value = -value
+    elif 360 >= value >= 270:
+        value = 360 - value
+    return value
+
+
+# round(k / 100, 2) * 100 for each whole percent k, float error and all, as _parse has always reported it
+_PERCENT_VALUES = tuple(k / 100 * 100 for k in range(101))
+
+
+def _ext_percent_value(d1, d2):
+    return _PERCENT_VALUES[_round_div(((d1 << 8) + d2) * 100, 0xFFFF)]
+
+
+_EXT_RESPONSE_HANDLERS = {
+    EXT_CMD_QUERY_PAN_RESPONSE: _ext_pan_response,
+    EXT_CMD_QUERY_TILT_RESPONSE: _ext_tilt_response,
+    EXT_CMD_QUERY_ZOOM_RESPONSE: _ext_percent_response,
+    EXT_CMD_QUERY_MAGNIFICATION_RESPONSE: _ext_percent_response,
+}
+
+# Commands not listed here (including EXT_CMD_SET_ZOOM) carry a 0-0xFFFF percentage
+_EXT_VALUE_HANDLERS = {
+    EXT_CMD_SET_AUX: _ext_id_value,
+    EXT_CMD_CLEAR_AUX: _ext_id_value,
+    EXT_CMD_CLEAR_PRESET: _ext_id_value,
+    EXT_CMD_SET_PRESET: _ext_id_value,
+    EXT_CMD_CALL_PRESET: _ext_id_value,
+    EXT_CMD_SET_PAN: _ext_pan_value,
+    EXT_CMD_SET_TILT: _ext_tilt_value,
+}
+
+
+def _clear_queue(q):
+    """Empties a Queue under a single lock acquisition instead of one get_nowait() per item"""
+    with q.mutex:
+        q.queue.clear()
+        q.unfinished_tasks = 0
+        q.all_tasks_done.notify_all()
+        q.not_full.notify_all()
 
 
 class PelcoDevice:
+    # Fixed attribute layout: no per-instance __dict__, and attribute loads in the receive path are slot offsets
+    __slots__ = ('model', 'connection_state', 'serial_number', 'firmware_version', 'library_version',
+                 'device_name', 'send_address', 'port', 'last_response_timeout',
+                 '_config', '_raw', '_timeout', '_mode', '_max_speed', '_speed_table', '_log_level',
+                 '_last_comm_ns', '_wall_offset_ns', '_last_command_ts',
+                 '_buffer', '_max_buffer_size', '_readers', '_filters', '_active',
+                 '_messages', '_responses', '_callback_queue', '_command_queue', '_serial_thread')
+
     def __init__(self, serial_comm=None, model=PelcoModel.DEFAULT, config=None):
-        if model not in get_enum_list(PelcoModel):
+        if model not in _PELCO_MODELS:
             raise ValueError("model '%s' not found" % model)
 
         # --- PUBLIC, LIBRARY STANDARD PROPERTIES ---
         self.model = model
         self.connection_state = ConnectionState.DISCONNECTED
-        self.last_communication_time = None
+        # Monotonic receive stamp; last_communication_time converts it to a datetime on demand
+        self._last_comm_ns = None
+        self._wall_offset_ns = time.time_ns() - time.monotonic_ns()
         self.serial_number = None
         self.firmware_version = None
         self.library_version = __version__
@@ -90,6 +265,9 @@ class PelcoDevice:
         self._timeout = self._config['timeout']
         self._mode = self._config['mode']
         self._max_speed = self._config['maxSpeed']
+        # Scaled speed for every possible data byte, so _parse never divides or rounds
+        self._speed_table = tuple(round(d / self._max_speed, 4) for d in range(256))
+        self._log_level = self._config.get('logLevel', LogLevel.WARNING)
 
         self.port = serial_comm
         if self.port:
@@ -101,7 +279,7 @@ class PelcoDevice:
         if self._config['mode'] in [Mode.PROXY, Mode.VIRTUAL, Mode.WRITE_ONLY]:
             self.connection_state = ConnectionState.CONNECTED
 
-        self._buffer = bytes()
+        self._buffer = bytearray()
         self._max_buffer_size = 256
 
         # Callbacks registered to receive incoming messages
@@ -115,32 +293,60 @@ class PelcoDevice:
         # Outgoing & incoming data
         self._messages = Queue()
         self._responses = Queue()
-        self._callback_queue = []
-        self._command_queue = []
+        self._callback_queue = deque()
+        self._command_queue = deque()
 
         self._serial_thread = None
 
         if self.port:
             self._start_serial_thread()
 
+    @property
+    def last_communication_time(self):
+        if self._last_comm_ns is None:
+            return None
+        return datetime.fromtimestamp((self._last_comm_ns + self._wall_offset_ns) / 1e9)
+
     def flush(self):
-        self._buffer = b''
+        self._buffer.clear()
 
     @staticmethod
-    def _find_packet(data):
-        """Searches for valid Pelco packets and returns the matching bytes plus a tuple
-        containing start and end indices."""
-        for i in range(len(data)):
+    def _find_packet(data, start=0):
+        """Searches data[start:] for valid Pelco packets and returns the matching bytes plus a tuple
+        containing start and end indices (relative to data), or None, (). The third value is the
+        first sync byte at or after start (-1 if none), so callers can drop garbage without rescanning."""
+        if _scan_packet_nb is not None:
+            # Compiled scan when Numba is installed: no size cut-off needed
+            i, first = _scan_packet_nb(np.frombuffer(data, dtype=np.uint8)[start:], COMMAND_SIZE)
+            first = first + start if first >= 0 else -1
+            if i < 0:
+                return None, (), first
+            i += start
+            return bytes(data[i:i + COMMAND_SIZE]), (i, i + COMMAND_SIZE), first
+
+        if len(data) - start >= _VECTOR_SCAN_MIN:
+            # Check every sync byte's checksum at once
+            arr = np.frombuffer(data, dtype=np.uint8)
+            syncs = np.flatnonzero(arr[start:] == SYNC_BYTE) + start
+            first = int(syncs[0]) if syncs.size else -1
+            starts = syncs[syncs <= len(arr) - COMMAND_SIZE]
+            if starts.size:
+                sums = arr[starts[:, None] + _CHECKSUM_SPAN].sum(axis=1, dtype=np.uint32) & 0xFF
+                hits = starts[sums == arr[starts + COMMAND_SIZE - 1]]
+                if hits.size:
+                    i = int(hits[0])
+                    return bytes(data[i:i + COMMAND_SIZE]), (i, i + COMMAND_SIZE), first
+            return None, (), first
+
+        # Short buffers: let find() jump between sync bytes instead of stepping every index
+        last = len(data) - COMMAND_SIZE
+        i = first = data.find(b'\xff', start)
+        while 0 <= i <= last:
             checksum_index = i + COMMAND_SIZE - 1
-            if checksum_index >= len(data):
-                break
-            if (
-                    data[i] == 0xff
-                    and
-                    data[checksum_index] == sum(data[i + 1:checksum_index]) % 0x100
-            ):
-                return data[i:i + COMMAND_SIZE], (i, i + COMMAND_SIZE)
-        return None, ()
+            if data[checksum_index] == sum(data[i + 1:checksum_index]) % 0x100:
+                return bytes(data[i:i + COMMAND_SIZE]), (i, i + COMMAND_SIZE), first
+            i = data.find(b'\xff', i + 1)
+        return None, (), first
 
     def _write_data(self, data):
         if self.port:
@@ -181,20 +387,22 @@ class PelcoDevice:
 
     def _readonly_loop(self):
         """A read-only loop for PROXY devices that parses incoming messages and calls listeners."""
+        # Reads must block until data arrives; a timeout here would turn the loop into a busy poll
+        self.port.timeout = None
         while self._active:
-            recv = self.port.read(1)
-            if recv == b'':
-                continue
+            # Block for at least one byte, then take everything already waiting in one read
+            recv = self.port.read(max(1, getattr(self.port, 'in_waiting', 0)))
             # self.log_message(LogLevel.DEBUG, 'RECV: %s' % str(recv))
             recv = self.ingest(recv)
             if not recv:
                 continue
 
-            self.last_communication_time = datetime.now()
+            self._last_comm_ns = time.monotonic_ns()
 
             # Would now call all of the registered reader callbacks
             for msg in recv:
-                self._log_message(LogLevel.DEBUG, 'RECV: %s' % str(msg))
+                if self._log_level <= LogLevel.DEBUG:
+                    self._log_message(LogLevel.DEBUG, 'RECV: %s' % str(msg))
 
                 # First apply filters to see if command is blocked / consumed
                 if not self._raw and msg['success']:
@@ -231,12 +439,14 @@ class PelcoDevice:
             self.port.write(data)
 
             if expects_reply:
-                self._command_queue.insert(0, data)
+                self._command_queue.appendleft(data)
                 self._await_response()
 
     def _await_response(self):
         while self._active:
-            data = self.port.read(1)
+            # Block for at least one byte, then take everything already waiting; a fixed-size read would
+            # sit out the whole timeout on a short (e.g. 4-byte general) response
+            data = self.port.read(max(1, getattr(self.port, 'in_waiting', 0)))
             # self._log_message(LogLevel.DEBUG, 'RECV %s' % data)
             if data == b'':
                 self._respond(error(ERR_TIMEOUT))
@@ -247,8 +457,9 @@ class PelcoDevice:
                 continue
 
             for response in responses:
-                self._log_message(LogLevel.DEBUG, 'Response: %s' % str(response))
-                self.last_communication_time = datetime.now()
+                if self._log_level <= LogLevel.DEBUG:
+                    self._log_message(LogLevel.DEBUG, 'Response: %s' % str(response))
+                self._last_comm_ns = time.monotonic_ns()
                 self.last_response_timeout = time.perf_counter() - self._last_command_ts
                 self._respond(response)
             return
@@ -291,10 +502,8 @@ class PelcoDevice:
 
     def _init_sequence(self, callback):
         # Ensure we are starting with clean Queues
-        while not self._messages.empty():
-            self._messages.get_nowait()
-        while not self._responses.empty():
-            self._responses.get_nowait()
+        _clear_queue(self._messages)
+        _clear_queue(self._responses)
         self._log_message(LogLevel.DEBUG, 'INIT cleared queues')
 
         self.connection_state = ConnectionState.CONNECTED
@@ -314,45 +523,51 @@ class PelcoDevice:
     def ingest(self, data):
         # Ignore rogue data if we're in NORMAL mode
         if self._mode == Mode.NORMAL and len(self._command_queue) == 0:
-            self._buffer = b''
+            self._buffer.clear()
             return []
 
-        self._buffer += data
+        # Appended in place; consumed packets only advance 'pos' and are cut once at the end
+        buf = self._buffer
+        buf += data
         # Cut off start of buffer (oldest bytes) if it gets too big
-        self._buffer = self._buffer[len(self._buffer) - self._max_buffer_size:]
+        max_size = self._max_buffer_size
+        if len(buf) > max_size:
+            del buf[:len(buf) - max_size]
 
-        responses = []
+        # Locate every complete packet first, then parse them as one batch
+        find_packet = self._find_packet
+        packets = []
+        pos = 0
 
         while True:
             # _find_packet will return the matching data (match) and the index range (position) of the match,
-            # or None, ()
-            match, position = self._find_packet(self._buffer)
+            # or None, (), plus the first sync byte from pos onwards
+            match, position, sync = find_packet(buf, pos)
 
             if not match:
                 break
 
-            self._buffer = self._buffer[position[-1]:]
+            pos = position[-1]
+            packets.append(match)
 
+        # Throw away consumed and garbage bytes, up to the sync byte the last scan already located
+        del buf[:sync if sync >= 0 else len(buf)]
+
+        parse = self._parse
+        responses = []
+        for packet in packets:
             try:
-                responses.append(self._parse(match))
-            except (KeyError, IndexError, ValueError):
+                responses.append(parse(packet))
+            except (KeyError, IndexError, ValueError, struct.error):
                 responses.append(error(ERR_BAD_VALUE))
 
-        # Throw away garbage bytes
-        i = self._buffer.find(b'\xff')
-        if i >= 0:
-            self._buffer = self._buffer[i:]
-        else:
-            self._buffer = b''
-
         return responses
 
     def _parse(self, packet):
         if self._raw:
             return packet
 
-        addr, c1, c2, d1, d2 = packet[ADDR_INDEX], packet[CMD1_INDEX], packet[CMD2_INDEX], \
-                               packet[DATA1_INDEX], packet[DATA2_INDEX]
+        _, addr, c1, c2, d1, d2, _ = _PACKET_UNPACK_FROM(packet, SYNC_INDEX)
 
         # Initialize to default of direct byte values in case of unknown packet
         data = {"addr": addr, "c1": c1, "c2": c2, "d1": d1, "d2": d2}
@@ -361,33 +576,10 @@ class PelcoDevice:
 
         # Handle standard command
         elif c1 <= 4 and c2 % 2 == 0:
-            cmd_string = ''
-            pan_speed = 0
-            tilt_speed = 0
-            if c1 & 0x4:
-                cmd_string += 'C'
-            elif c1 & 0x2:
-                cmd_string += 'O'
-            if c1 & 0x1:
-                cmd_string += 'N'
-            elif c2 & 0x80:
-                cmd_string += 'F'
-            if c2 & 0x40:
-                cmd_string += 'W'
-            elif c2 & 0x20:
-                cmd_string += 'T'
-            if c2 & 0x10:
-                cmd_string += 'D'
-                tilt_speed = round(d2 / self._max_speed, 4)
-            if c2 & 0x8:
-                cmd_string += 'U'
-                tilt_speed = round(d2 / self._max_speed, 4)
-            if c2 & 0x4:
-                cmd_string += 'L'
-                pan_speed = round(d1 / self._max_speed, 4)
-            if c2 & 0x2:
-                cmd_string += 'R'
-                pan_speed = round(d1 / self._max_speed, 4)
+            cmd_string, has_pan, has_tilt = _STD_CMD_TABLE[((c1 & 7) << 8) | c2]
+            speed = self._speed_table
+            pan_speed = speed[d1] if has_pan else 0
+            tilt_speed = speed[d2] if has_tilt else 0
 
             if tilt_speed > 1:
                 return error(ERR_BAD_TILT, data=tilt_speed)
@@ -402,40 +594,10 @@ class PelcoDevice:
 
         # Handle Extended command
         elif c2 % 2 == 1:
-            if c2 in [EXT_CMD_SET_AUX, EXT_CMD_CLEAR_AUX, EXT_CMD_CLEAR_PRESET,
-                      EXT_CMD_SET_PRESET, EXT_CMD_CALL_PRESET]:
-                value = d2
-
-            elif c2 == EXT_CMD_QUERY_PAN_RESPONSE:
-                pan = int.from_bytes(bytes([d1, d2]), 'big') / 100
-                return success(round(pan, 2))
-
-            elif c2 == EXT_CMD_QUERY_TILT_RESPONSE:
-                tilt = int.from_bytes(bytes([d1, d2]), 'big') / 100
-                if 0 <= tilt <= 90:
-                    tilt = -tilt
-                elif 270 <= tilt <= 360:
-                    tilt = 360 - tilt
-                else:
-                    return error(ERR_BAD_VALUE)
-                return success(round(tilt, 2))
-
-            elif c2 in [EXT_CMD_QUERY_ZOOM_RESPONSE, EXT_CMD_QUERY_MAGNIFICATION_RESPONSE]:
-                return success(round(((d1 << 8) + d2) / 0xFFFF * 100, 2))
-
-            elif c2 == EXT_CMD_SET_PAN:
-                value = int.from_bytes(bytes([d1, d2]), 'big') / 100
-
-            elif c2 == EXT_CMD_SET_TILT:
-                value = int.from_bytes(bytes([d1, d2]), 'big') / 100
-                if 90 >= value >= 0:
-                    value = -value
-                elif 360 >= value >= 270:
-                    value = 360 - value
-            elif c2 in [EXT_CMD_SET_ZOOM]:
-                value = round(((d1 << 8) + d2) / 0xFFFF, 2) * 100
-            else:
-                value = round(((d1 << 8) + d2) / 0xFFFF, 2) * 100
+            respond = _EXT_RESPONSE_HANDLERS.get(c2)
+            if respond is not None:
+                return respond(d1, d2)
+            value = _EXT_VALUE_HANDLERS.get(c2, _ext_percent_value)(d1, d2)
             data = {"addr": addr, "type": TYPE_EXTENDED, "c1": round(c1 / EXTENDED_MAX_SPEED, 4)*100, "id": c2, "data": value}
 
         else:
@@ -501,7 +663,7 @@ class PelcoDevice:
         if magnification_pct < 0 or magnification_pct > 100:
             raise ValueError("'magnification_pct' must be in range 0.0 to 100.0")
 
-        position = int(magnification_pct / 100 * 0xFFFF)
+        position = int(magnification_pct * _PCT_TO_U16)
         self._write_data(
             self._command(cmd2=EXT_CMD_QUERY_MAGNIFICATION_RESPONSE, data1=position >> 8, data2=position & 0xff))
 
@@ -509,7 +671,7 @@ class PelcoDevice:
         if zoom_pct < 0 or zoom_pct > 100:
             raise ValueError("'zoom_pct' must be in range 0.0 to 100.0")
 
-        position = int(zoom_pct / 100 * 0xFFFF)
+        position = int(zoom_pct * _PCT_TO_U16)
         self._write_data(self._command(cmd2=EXT_CMD_QUERY_ZOOM_RESPONSE, data1=position >> 8, data2=position & 0xff))
 
     def pan_query_response(self, pan_degrees):
@@ -593,7 +755,7 @@ class PelcoDevice:
         if zoom_pct < 0 or zoom_pct > 100:
             raise ValueError("'zoom_pct' must be in range 0.0 to 100.0")
 
-        zoom_value = int(zoom_pct / 100 * 0xFFFF)
+        zoom_value = int(zoom_pct * _PCT_TO_U16)
         self._write_data(self._command(0, EXT_CMD_SET_ZOOM, zoom_value >> 8, zoom_value & 0xff))
         return success()
 
@@ -601,7 +763,7 @@ class PelcoDevice:
         if not (0 <= magnification_pct <= 100):
             raise ValueError("'magnification_pct' must be in range 0.0 to 100.0")
 
-        mag_value = int(magnification_pct / 100 * 0xFFFF)
+        mag_value = int(magnification_pct * _PCT_TO_U16)
         self._write_data(self._command(0, EXT_CMD_SET_MAGNIFICATION, mag_value >> 8, mag_value & 0xff))
         return success()
 
@@ -626,10 +788,8 @@ class PelcoDevice:
     # -----------------------------------------------------
 
     def _command(self, cmd1=0, cmd2=0, data1=0, data2=0):
-        packet = [self.send_address, cmd1, cmd2, data1, data2]
-        packet.append(sum(packet) % 0x100)
-        packet.insert(0, SYNC_BYTE)
-        return bytes(packet)
+        addr = self.send_address
+        return bytes((SYNC_BYTE, addr, cmd1, cmd2, data1, data2, (addr + cmd1 + cmd2 + data1 + data2) & 0xFF))
 
     def _get_response(self, data, callback=None, ignore_state=False):
         if not ignore_state and self.connection_state == ConnectionState.INITIALIZING:
@@ -642,7 +802,7 @@ class PelcoDevice:
         self._messages.put((True, data))
 
         if callback:
-            self._callback_queue.insert(0, callback)
+            self._callback_queue.appendleft(callback)
             return
 
         try:
@@ -651,4 +811,6 @@ class PelcoDevice:
             return error(ERR_TIMEOUT)
 
     def _log_message(self, level, message):
-        print(level, '[%s] - %s: %s' % (level, self.device_name, message))
+        if level < self._log_level:
+            return
+        sys.stderr.write('[%s] - %s: %s\n' % (LogLevel.getLevelName(level), self.device_name, message))
@@ -1,12 +1,24 @@
 import base64
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QFileDialog, QMessageBox, QComboBox, QSpinBox
 )
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding
+from license_manager import canonical_payload
+
+# Signature scheme shared with LicenseManager._verify_signature
+_PSS = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+_HASH = hashes.SHA256()
+
+
+def _sign(private_key, data):
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return private_key.sign(data)
+    return private_key.sign(data, _PSS, _HASH)
 
 
 class LicenseGenerator(QWidget):
@@ -16,6 +28,7 @@ class LicenseGenerator(QWidget):
         self.setMinimumWidth(450)
 
         self.private_key = None  # Will hold the loaded private key
+        self._signer = ThreadPoolExecutor(max_workers=1)  # keeps RSA signing off the GUI thread
 
         layout = QVBoxLayout()
 
@@ -68,11 +81,7 @@ class LicenseGenerator(QWidget):
 
             # Simple verification: try signing some data
             test_data = b"verify_key"
-            self.private_key.sign(
-                test_data,
-                padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
-                hashes.SHA256()
-            )
+            _sign(self.private_key, test_data)
 
             # Update UI
             self.key_label.setText(f"Private key loaded: {key_path.split('/')[-1]}")
@@ -113,18 +122,13 @@ class LicenseGenerator(QWidget):
             license_data["expires"] = expires
 
         try:
-            # Sign license
-            data_bytes = json.dumps({k: v for k, v in license_data.items() if k != "signature"}, sort_keys=True).encode()
-            signature = self.private_key.sign(
-                data_bytes,
-                padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
-                hashes.SHA256()
-            )
-            license_data["signature"] = signature.hex()
+            # Sign license in the background while the save dialog is up (license_data has no "signature" yet)
+            pending = self._signer.submit(_sign, self.private_key, canonical_payload(license_data))
 
             # Save as base64 .lic
             save_path, _ = QFileDialog.getSaveFileName(self, "Save License", "license.lic", "License Files (*.lic)")
             if save_path:
+                license_data["signature"] = pending.result().hex()
                 license_json = json.dumps(license_data, indent=2)
                 encoded = base64.b64encode(license_json.encode()).decode()
                 with open(save_path, "w") as f:
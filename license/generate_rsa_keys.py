@@ -1,12 +1,21 @@
 # license/generate_rsa_keys.py
-from cryptography.hazmat.primitives.asymmetric import rsa
+# Pass --ed25519 for an Ed25519 key pair (faster verification, smaller licenses); issued licenses
+# only verify against the key pair that signed them
+import sys
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
 from cryptography.hazmat.primitives import serialization
 
-private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+if "--ed25519" in sys.argv[1:]:
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    private_format = serialization.PrivateFormat.PKCS8  # Ed25519 has no TraditionalOpenSSL encoding
+else:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_format = serialization.PrivateFormat.TraditionalOpenSSL
+
 with open("private.pem", "wb") as f:
     f.write(private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.TraditionalOpenSSL,
+        format=private_format,
         encryption_algorithm=serialization.NoEncryption(),
     ))
 
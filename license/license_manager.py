@@ -4,26 +4,101 @@ import json
 import base64
 import hashlib
 import platform
+import time
 import uuid
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
+
+try:
+    from pybase64 import b64decode  # SIMD decoder, same results as the stdlib one
+except ImportError:
+    from base64 import b64decode
+
+try:
+    import win32crypt  # Windows only: DPAPI, seals the fingerprint cache to this machine
+except ImportError:
+    win32crypt = None
+
+# Signature scheme shared with generate_license.py: RSA-PSS, or Ed25519 (no padding/hash) for Ed25519 keys.
+# cryptography is slow to import, so it is only loaded (by _pss) once a signature is actually checked
+_PSS = None
+_HASH = None
+
+# The CPU/motherboard queries spawn PowerShell on Windows, so the last fingerprint is reused for a day.
+# The device ID is derived from it, so the cache is sealed with machine-scope DPAPI: a copied or edited
+# file fails to unseal and the fingerprint is collected again.
+_FINGERPRINT_CACHE = os.path.join(os.path.expanduser("~"), ".vms_fingerprint.bin")
+_FINGERPRINT_TTL = 86400
+_FINGERPRINT_ENTROPY = b"vms-hardware-fingerprint"
+_CRYPTPROTECT_UI_FORBIDDEN = 0x1
+_CRYPTPROTECT_LOCAL_MACHINE = 0x4
+
+
+def canonical_payload(license_data):
+    """The exact bytes that are signed and verified for a license (everything but its "signature").
+    Kept on json.dumps' default separators: changing the encoding would invalidate issued licenses"""
+    return json.dumps(license_data, sort_keys=True).encode()
+
+
+def _pss():
+    global _PSS, _HASH
+    if _PSS is None:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+        _HASH = hashes.SHA256()
+        _PSS = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+    return _PSS, _HASH
+
+
+def _query_cim(cim_class, prop):
+    """Output of 'Get-CimInstance <cim_class> | Select-Object -ExpandProperty <prop>', through the
+    wmi module when it is available and PowerShell otherwise"""
+    # Imported here, not at module level: pythoncom loads COM and wmi sets up its moniker on import,
+    # which startup should not pay when the fingerprint comes from the cache
+    try:
+        import pythoncom
+        import wmi  # Windows only: direct WMI queries without starting PowerShell
+    except ImportError:
+        wmi = None
+    if wmi is not None:
+        # Each fingerprint query runs on its own worker thread, which needs COM set up before using WMI
+        pythoncom.CoInitialize()
+        try:
+            values = [getattr(obj, prop) for obj in getattr(wmi.WMI(), cim_class)()]
+            return "\r\n".join(str(v) for v in values if v is not None).strip()
+        except Exception:
+            pass
+        finally:
+            pythoncom.CoUninitialize()
+    cmd = ["powershell", "-Command", f"Get-CimInstance {cim_class} | Select-Object -ExpandProperty {prop}"]
+    return subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode().strip()
 
 
 class LicenseManager:
     def __init__(self, public_key_path="public.pem", license_file="license.lic", tolerance=0.66):
         self.license_file = license_file
-        self.public_key = self._load_public_key(public_key_path) if os.path.exists(public_key_path) else None
+        self._public_key_path = public_key_path
+        self._public_key = None
+        self._public_key_loaded = False
         self.tolerance = tolerance
-        self.hardware_fingerprint = self._collect_fingerprint()
+        self.hardware_fingerprint = self._load_cached_fingerprint()
         self.device_id = self._generate_device_id()
 
-        # cache
-        self._last_license_data = None
+        # cache: ((st_mtime_ns, st_size) of the license file, result)
+        self._license_cache = None
 
     # ---------------- Public Methods ---------------- #
 
+    @property
+    def public_key(self):
+        """Loaded on first use rather than in __init__, so constructing the manager does not import cryptography"""
+        if not self._public_key_loaded:
+            path = self._public_key_path
+            self._public_key = self._load_public_key(path) if os.path.exists(path) else None
+            self._public_key_loaded = True
+        return self._public_key
+
     def get_device_id(self):
         return self.device_id
 
@@ -47,7 +122,7 @@ class LicenseManager:
                 content = f.read().strip()
 
             # decode base64
-            decoded = base64.b64decode(content).decode()
+            decoded = b64decode(content).decode()
             license_data = json.loads(decoded)
 
             sig = license_data.get("signature")
@@ -70,66 +145,95 @@ class LicenseManager:
 
     def load_license(self, force=False):
         """Load and validate license"""
-        if self._last_license_data and not force:
-            return self._last_license_data
-
-        if not os.path.exists(self.license_file):
+        try:
+            st = os.stat(self.license_file)
+        except OSError:
             return {"status": "no_license"}
 
+        # Only decode and verify again once the file itself has changed
+        key = (st.st_mtime_ns, st.st_size)
+        if self._license_cache and self._license_cache[0] == key and not force:
+            return self._license_cache[1]
+
         try:
             with open(self.license_file, "r") as f:
                 content = f.read().strip()
-            decoded = base64.b64decode(content).decode()
+            decoded = b64decode(content).decode()
             full_data = json.loads(decoded)
 
             signature = bytes.fromhex(full_data.pop("signature", ""))
             if not self._verify_signature(full_data, signature):
-                return {"status": "invalid_signature"}
+                result = {"status": "invalid_signature"}
 
             # Device ID check
-            if full_data["device_id"] != self.device_id:
-                return {"status": "hardware_mismatch"}
+            elif full_data["device_id"] != self.device_id:
+                result = {"status": "hardware_mismatch"}
 
-            if full_data.get("license_type") == "temporary":
+            elif full_data.get("license_type") == "temporary":
                 if datetime.strptime(full_data.get("expires"), "%Y-%m-%d") < datetime.today():
-                    return {"status": "expired"}
-                result = {"status": "valid_temporary", "license": full_data}
+                    result = {"status": "expired"}
+                else:
+                    result = {"status": "valid_temporary", "license": full_data}
             else:
                 result = {"status": "valid_permanent", "license": full_data}
 
-            self._last_license_data = result
-            return result
-
         except Exception as e:
             return {"status": "invalid_license", "error": str(e)}
+
+        self._license_cache = (key, result)
+        return result
     # ---------------- Internal Helpers ---------------- #
 
     def _load_public_key(self, path):
+        from cryptography.hazmat.primitives import serialization
         try:
             with open(path, "rb") as f:
                 return serialization.load_pem_public_key(f.read())
         except Exception:
             return None
 
+    def _load_cached_fingerprint(self, ttl=_FINGERPRINT_TTL):
+        """Return the cached fingerprint if it is fresh and was sealed on this machine, otherwise collect and
+        cache it. Without DPAPI (non-Windows, where collection is only file reads) there is no cache."""
+        if win32crypt is None:
+            return self._collect_fingerprint()
+
+        host = (self._get_mac_address(), platform.node())
+        try:
+            with open(_FINGERPRINT_CACHE, "rb") as f:
+                _, sealed = win32crypt.CryptUnprotectData(f.read(), _FINGERPRINT_ENTROPY, None, None,
+                                                          _CRYPTPROTECT_UI_FORBIDDEN)
+            cached = json.loads(sealed)
+            fingerprint = cached["fingerprint"]
+            if (fingerprint["mac"], cached["host"]) == host and time.time() - cached["timestamp"] < ttl:
+                return fingerprint
+        except Exception:
+            pass
+
+        fingerprint = self._collect_fingerprint()
+        try:
+            payload = json.dumps({"host": host[1], "timestamp": time.time(), "fingerprint": fingerprint}).encode()
+            sealed = win32crypt.CryptProtectData(payload, None, _FINGERPRINT_ENTROPY, None, None,
+                                                 _CRYPTPROTECT_LOCAL_MACHINE | _CRYPTPROTECT_UI_FORBIDDEN)
+            with open(_FINGERPRINT_CACHE, "wb") as f:
+                f.write(sealed)
+        except Exception:
+            pass
+        return fingerprint
+
     def _collect_fingerprint(self):
-        return {
-            "cpu": self._get_cpu_id(),
-            "motherboard": self._get_motherboard_id(),
-            "mac": self._get_mac_address()
-        }
+        return collect_fingerprint()
 
     def _generate_device_id(self):
         """Generate a short unique device ID from fingerprint"""
         fingerprint_str = json.dumps(self.hardware_fingerprint, sort_keys=True)
         return base64.b64encode(hashlib.sha256(fingerprint_str.encode()).digest()).decode()[:16]
 
-    def _get_cpu_id(self):
+    @staticmethod
+    def _get_cpu_id():
         try:
             if platform.system() == "Windows":
-                cmd = ["powershell", "-Command",
-                       "Get-CimInstance Win32_Processor | Select-Object -ExpandProperty ProcessorId"]
-                res = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
-                return res.decode().strip() or "Unknown_CPU"
+                return _query_cim("Win32_Processor", "ProcessorId") or "Unknown_CPU"
             elif platform.system() == "Linux":
                 with open("/proc/cpuinfo", "r") as f:
                     for line in f:
@@ -140,13 +244,11 @@ class LicenseManager:
         except Exception:
             return "Unknown_CPU"
 
-    def _get_motherboard_id(self):
+    @staticmethod
+    def _get_motherboard_id():
         try:
             if platform.system() == "Windows":
-                cmd = ["powershell", "-Command",
-                       "Get-CimInstance Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber"]
-                res = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
-                return res.decode().strip() or "Unknown_MB"
+                return _query_cim("Win32_BaseBoard", "SerialNumber") or "Unknown_MB"
             elif platform.system() == "Linux":
                 try:
                     return open("/sys/class/dmi/id/board_serial", "r").read().strip()
@@ -156,7 +258,8 @@ class LicenseManager:
         except Exception:
             return "Unknown_MB"
 
-    def _get_mac_address(self):
+    @staticmethod
+    def _get_mac_address():
         try:
             mac = uuid.getnode()
             mac_str = ':'.join(('%012X' % mac)[i:i + 2] for i in range(0, 12, 2))
@@ -165,19 +268,29 @@ class LicenseManager:
             return "Unknown_MAC"
 
     def _verify_signature(self, license_data, signature):
-        if not self.public_key:
+        public_key = self.public_key
+        if not public_key:
             return False
-        data = json.dumps(license_data, sort_keys=True).encode()
+        from cryptography.hazmat.primitives.asymmetric import ed25519
         try:
-            self.public_key.verify(
-                signature,
-                data,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            if isinstance(public_key, ed25519.Ed25519PublicKey):
+                public_key.verify(signature, canonical_payload(license_data))
+            else:
+                public_key.verify(signature, canonical_payload(license_data), *_pss())
             return True
         except Exception:
             return False
+
+
+def collect_fingerprint():
+    """Hardware fingerprint of this machine, without constructing a LicenseManager"""
+    # The queries are independent and mostly wait on subprocesses/WMI, so run them side by side
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        cpu = pool.submit(LicenseManager._get_cpu_id)
+        motherboard = pool.submit(LicenseManager._get_motherboard_id)
+        mac = pool.submit(LicenseManager._get_mac_address)
+        return {
+            "cpu": cpu.result(),
+            "motherboard": motherboard.result(),
+            "mac": mac.result()
+        }
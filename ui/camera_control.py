@@ -6,6 +6,7 @@ class CameraControlSection(QGroupBox):
     def __init__(self, main_window):
         super().__init__("Camera Control")
         self.main_window = main_window
+        self._combo_items = None  # labels currently shown in camera_combo
         self.init_ui()
 
     def init_ui(self):
@@ -83,9 +84,15 @@ class CameraControlSection(QGroupBox):
         self.disconnect_btn.clicked.connect(self.main_window.disconnect_camera)
 
     def update_camera_combo(self):
+        items = [conn.get("ip", "-") + "  :  " + conn.get("name", "Unnamed") for conn in self.main_window.connections]
+        if items == self._combo_items:
+            return
+        self._combo_items = items
+
+        self.camera_combo.blockSignals(True)
         self.camera_combo.clear()
-        for conn in self.main_window.connections:
-            self.camera_combo.addItem(conn.get("ip", "-") + "  :  " + conn.get("name", "Unnamed"))
+        self.camera_combo.addItems(items)
+        self.camera_combo.blockSignals(False)
 
     def set_stream_buttons(self, rtsp_map):
         # Clear previous buttons
@@ -9,6 +9,7 @@ class ConnectionTab(QWidget):
     def __init__(self, main_window):
         super().__init__(main_window)
         self.main_window = main_window
+        self._combo_items = None  # labels currently shown in conn_combo
         self.init_ui()
         self.update_button_states()
 
@@ -116,7 +117,6 @@ class ConnectionTab(QWidget):
         layout.addStretch()
         self.setLayout(layout)
         self.update_connection_combo()
-        self.update_connection_details()
 
     def connect_signals(self):
         """Connect all UI signals to their handlers"""
@@ -176,11 +176,17 @@ class ConnectionTab(QWidget):
 
     def update_connection_combo(self):
         """Update the camera connections dropdown"""
+        items = [conn.get("ip", "-") + "  :  " + conn.get("name", "Unnamed") for conn in self.main_window.connections]
+        if items == self._combo_items:
+            return
+        self._combo_items = items
+
         current_text = self.conn_combo.currentText() if self.conn_combo.currentIndex() != -1 else None
-        self.conn_combo.clear()
 
-        for conn in self.main_window.connections:
-            self.conn_combo.addItem(conn.get("ip", "-") + "  :  " + conn.get("name", "Unnamed"))
+        # Rebuild silently; the details panel is refreshed once below instead of on every intermediate index
+        self.conn_combo.blockSignals(True)
+        self.conn_combo.clear()
+        self.conn_combo.addItems(items)
 
         # Try to restore previous selection if possible
         if current_text:
@@ -189,6 +195,9 @@ class ConnectionTab(QWidget):
                 self.conn_combo.setCurrentIndex(index)
         elif self.conn_combo.count() > 0:  # Select first item if nothing was selected
             self.conn_combo.setCurrentIndex(0)
+        self.conn_combo.blockSignals(False)
+
+        self.update_connection_details()
 
     def update_connection_details(self):
         """Update the connection details display"""
@@ -1000,10 +1000,10 @@ class VMSMainWindow(QMainWindow):
                     time.sleep(1)
                     continue
 
-                self.ptz_controller.get_pan(self._safe_callback_wrapper('pan'))
-                self.ptz_controller.get_tilt(self._safe_callback_wrapper('tilt'))
-                self.ptz_controller.get_zoom(self._safe_callback_wrapper('zoom'))
-                self.ptz_controller.get_focus(self._safe_callback_wrapper('focus'))
+                self.ptz_controller.query_position_batch(
+                    (0x51, 0x53, 0x55, 0x61),
+                    [self._safe_callback_wrapper(axis) for axis in ('pan', 'tilt', 'zoom', 'focus')]
+                )
 
                 time.sleep(0.75)
 
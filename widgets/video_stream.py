@@ -1,14 +1,53 @@
+import sys
 import cv2
 import numpy as np
 import json
 from PySide6.QtWidgets import (QLabel, QPushButton, QHBoxLayout,
                                QVBoxLayout, QWidget, QMessageBox)
-from PySide6.QtCore import Qt, QThread, Signal, Slot, QMutex, QMutexLocker
+from PySide6.QtCore import Qt, QThread, Signal, Slot, QMutex, QMutexLocker, QTimer
 from PySide6.QtGui import QImage, QPixmap
 import time
+import threading
 import requests
 
 
+# Hardware H.264 decoders to try per platform, best first. 'decodebin' lets GStreamer pick by rank.
+if sys.platform == "darwin":
+    _HW_DECODERS = ("vtdec_hw", "vtdec")
+elif sys.platform.startswith("win"):
+    _HW_DECODERS = ("nvh264dec", "d3d11h264dec")
+else:
+    _HW_DECODERS = ("nvh264dec", "vaapih264dec", "v4l2h264dec")
+
+
+def _gstreamer_pipeline(url, decoder, size=None):
+    if decoder == "decodebin":
+        decode = "decodebin"
+    else:
+        decode = f"rtph264depay ! h264parse ! {decoder}"
+    # Scale before colour conversion so only display-sized frames are converted and copied out.
+    # Square pixels plus add-borders letterboxes the picture into the requested size instead of stretching it.
+    scale = (f"videoscale add-borders=true ! video/x-raw,width={size[0]},height={size[1]},pixel-aspect-ratio=1/1 ! "
+             if size else "")
+    # Quoted so '!', spaces or '&' in credentials/query strings don't split the launch line
+    location = url.replace("\\", "\\\\").replace('"', '\\"')
+    return (f'rtspsrc location="{location}" latency=50 ! {decode} ! {scale}videoconvert ! video/x-raw,format=BGR ! '
+            "appsink drop=1 max-buffers=1 sync=false")
+
+
+def open_capture(url, size=None):
+    """Open an RTSP stream on a hardware decoder via GStreamer, falling back to FFmpeg software decode.
+    With a (width, height) size the GStreamer pipeline outputs frames already scaled to it."""
+    if url.startswith("rtsp") and cv2.videoio_registry.hasBackend(cv2.CAP_GSTREAMER):
+        for decoder in _HW_DECODERS + ("decodebin",):
+            cap = cv2.VideoCapture(_gstreamer_pipeline(url, decoder, size), cv2.CAP_GSTREAMER)
+            if cap.isOpened():
+                return cap
+            cap.release()
+
+    return cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+
+
 class VideoWorker(QThread):
     frame_ready = Signal(np.ndarray)
     connection_status = Signal(bool, str)
@@ -19,46 +58,105 @@ class VideoWorker(QThread):
         self._running = False
         self._cap = None
         self._url = ""
+        self._size = None  # (width, height) to decode to, or None for native resolution
         self._mutex = QMutex()
 
+        # Hand-off between the grab thread and the display loop
+        self._grab_thread = None
+        self._frame_cond = threading.Condition()
+        self._frame_wanted = False
+        self._pending_frame = None
+        self._grab_error = None
+        self.latest_ts = 0.0  # monotonic time of the most recent successful grab()
+
     def set_url(self, url):
         with QMutexLocker(self._mutex):
             self._url = url
 
+    def set_output_size(self, size):
+        with QMutexLocker(self._mutex):
+            self._size = size
+
     def run(self):
         self._running = True
 
         try:
             with QMutexLocker(self._mutex):
                 url = self._url
+                size = self._size
 
             if not url:
                 self.error_occurred.emit("Empty URL provided")
                 return
 
-            self._cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+            self._cap = open_capture(url, size)
             if not self._cap.isOpened():
                 self.error_occurred.emit("Failed to open stream")
                 return
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
             self.connection_status.emit(True, "Connected")
 
-            while self._running and self._cap.isOpened():
-                for _ in range(2):  # Skip frames to get latest
-                    self._cap.grab()
-
-                ret, frame = self._cap.retrieve()
-                if not ret:
-                    self.error_occurred.emit("Frame retrieval failed")
+            self._pending_frame = None
+            self._grab_error = None
+            self._grab_thread = threading.Thread(target=self._grab_loop, daemon=True)
+            self._grab_thread.start()
+
+            while self._running:
+                # Ask the grab thread for the next frame and wait for it to be decoded
+                with self._frame_cond:
+                    self._frame_wanted = True
+                    self._frame_cond.wait_for(
+                        lambda: self._pending_frame is not None or self._grab_error or not self._running,
+                        timeout=1.0
+                    )
+                    frame, self._pending_frame = self._pending_frame, None
+                    error = self._grab_error
+
+                if error:
+                    self.error_occurred.emit(error)
                     break
-
-                self.frame_ready.emit(frame)
+                if frame is not None:
+                    self.frame_ready.emit(frame)
 
         except Exception as e:
             self.error_occurred.emit(f"Stream error: {str(e)}")
         finally:
+            self._running = False
+            if self._grab_thread:
+                self._grab_thread.join()
+                self._grab_thread = None
             self._cleanup()
 
+    def _grab_loop(self):
+        """Owns the capture: keeps the demuxer drained and only retrieves frames that will be shown"""
+        cap = self._cap
+        while self._running and cap.isOpened():
+            if not cap.grab():
+                error = "Frame grab failed"
+            else:
+                self.latest_ts = time.monotonic()
+                if not self._frame_wanted:
+                    continue
+                ret, frame = cap.retrieve()
+                error = None if ret else "Frame retrieval failed"
+
+            with self._frame_cond:
+                if error:
+                    self._grab_error = error
+                else:
+                    self._pending_frame = frame
+                    self._frame_wanted = False
+                self._frame_cond.notify()
+            if error:
+                return
+
+        if self._running:
+            # The capture closed under us: report it so the display loop stops instead of waiting forever
+            with self._frame_cond:
+                self._grab_error = "Stream closed"
+                self._frame_cond.notify()
+
     def _cleanup(self):
         if self._cap and self._cap.isOpened():
             self._cap.release()
@@ -78,6 +176,17 @@ class RTSPVideoStream:
         self._connect_signals()
         self.stream_buttons = {}  # Stores stream buttons by name
         self.available_streams = {}  # Stores available stream URLs
+        # Two pixmaps used alternately, so the one being refilled is never the one the label still
+        # shares (which would force a detach and a fresh allocation on write)
+        self._display_pixmaps = [QPixmap(), QPixmap()]
+        self._output_size = None  # Size the worker is decoding to
+        self._restart_pending = False  # worker stopped for a resize, restart once it has finished
+
+        # Debounce label resizes before restarting the capture at the new decode size
+        self._resize_timer = QTimer()
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(500)
+        self._resize_timer.timeout.connect(self._apply_output_size)
 
     def _setup_ui(self):
         self.video_label = QLabel()
@@ -181,11 +290,39 @@ class RTSPVideoStream:
 
         self.video_label.setText("Connecting...")
         self.worker.set_url(rtsp_url)
+        self._output_size = self._label_size()
+        self.worker.set_output_size(self._output_size)
         self.worker.start()
         return True
 
+    def _label_size(self):
+        """Current label size rounded down to even dimensions, or None before the label is laid out"""
+        w, h = self.video_label.width() & ~1, self.video_label.height() & ~1
+        return (w, h) if w >= 2 and h >= 2 else None
+
+    def _apply_output_size(self):
+        """Restart the running capture so the decoder outputs frames at the label's size"""
+        size = self._label_size()
+        if not self._restart_pending:
+            if size == self._output_size or not self.worker.isRunning():
+                return
+            self.worker.stop()
+            self._restart_pending = True
+        if self.worker.isRunning():
+            # stop() only waits 500 ms and the worker may still be in a blocking grab(); start() would
+            # be a no-op on a running thread, so check again later
+            self._resize_timer.start()
+            return
+
+        self._restart_pending = False
+        self._output_size = size
+        self.worker.set_output_size(size)
+        self.worker.start()
+
     def disconnect(self):
         """Disconnect from current stream"""
+        self._resize_timer.stop()
+        self._restart_pending = False
         if self.worker.isRunning():
             self.worker.stop()
         self.video_label.setText("Stream disconnected")
@@ -193,18 +330,28 @@ class RTSPVideoStream:
     @Slot(np.ndarray)
     def _update_frame(self, frame):
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_frame.shape
-            bytes_per_line = ch * w
-            q_img = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_img)
-
-            self.video_label.setPixmap(pixmap.scaled(
-                self.video_label.width(),
-                self.video_label.height(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            ))
+            h, w = frame.shape[:2]
+            label_w, label_h = self.video_label.width(), self.video_label.height()
+            if self._label_size() != self._output_size and not self._resize_timer.isActive():
+                self._resize_timer.start()
+
+            # Fit to the label in OpenCV (one area-averaged pass) instead of a smooth Qt scale
+            scale = min(label_w / w, label_h / h)
+            if scale > 0 and abs(scale - 1.0) > 1e-3:
+                target = (max(1, int(w * scale)), max(1, int(h * scale)))
+                frame = cv2.resize(frame, target, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+                h, w = frame.shape[:2]
+
+            # QImage can only wrap a C-contiguous buffer; copy only when the frame is a strided view
+            if not frame.flags['C_CONTIGUOUS']:
+                frame = np.ascontiguousarray(frame)
+
+            # Wrap the BGR buffer directly; the QImage only lives until the pixmap has copied it
+            q_img = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+            pixmaps = self._display_pixmaps
+            pixmaps.reverse()
+            pixmaps[0].convertFromImage(q_img)
+            self.video_label.setPixmap(pixmaps[0])
         except Exception as e:
             self._handle_error(f"Frame display error: {str(e)}")
 